@@ -39,7 +39,7 @@ class ResearchDocument:
     publication_date: Optional[str] = None
     citations: int = 0
     relevance_score: float = 0.0
-    embedding: Optional[List[float]] = None
+    embedding: Optional[np.ndarray] = None  # float16, pickle storage only; older pickles may hold a list of floats
     created_at: str = ""
     
     def __post_init__(self):
@@ -185,7 +185,10 @@ class AdvancedRAGSystem:
                 sort_by=arxiv.SortCriterion.Relevance
             )
             
-            async for result in search.results():
+            # The arxiv client pages synchronously over HTTP; keep it off the event loop
+            arxiv_results = await asyncio.to_thread(lambda: list(arxiv.Client().results(search)))
+            
+            for result in arxiv_results:
                 doc = ResearchDocument(
                     id="",  # Will be generated
                     title=result.title,
@@ -210,6 +213,10 @@ class AdvancedRAGSystem:
             max_results = self.config['scholar_max_results']
         
         logger.info(f"Searching Google Scholar for: {query}")
+        # scholarly is fully synchronous (and slow); run it on a worker thread
+        return await asyncio.to_thread(self._search_google_scholar_sync, query, max_results)
+    
+    def _search_google_scholar_sync(self, query: str, max_results: int) -> List[ResearchDocument]:
         documents = []
         
         try:
@@ -296,49 +303,71 @@ class AdvancedRAGSystem:
     
     async def add_document(self, document: ResearchDocument):
         """Add document to the knowledge base"""
-        logger.info(f"Adding document: {document.title[:50]}...")
-        
-        # Generate embedding
-        text_to_embed = f"{document.title} {document.abstract} {document.content[:1000]}"
-        document.embedding = self.encoder.encode(text_to_embed).tolist()
-        
-        # Chunk the content
-        chunks = self._chunk_text(document.content)
-        
-        # Add to ChromaDB
-        for i, chunk in enumerate(chunks):
-            chunk_id = f"{document.id}_chunk_{i}"
-            chunk_embedding = self.encoder.encode(chunk).tolist()
-            
-            metadata = {
-                "doc_id": document.id,
-                "title": document.title,
-                "authors": json.dumps(document.authors),
-                "source": document.source,
-                "url": document.url or "",
-                "chunk_index": i,
-                "citations": document.citations
-            }
-            
-            self.collection.add(
-                ids=[chunk_id],
-                documents=[chunk],
-                embeddings=[chunk_embedding],
-                metadatas=[metadata]
+        await self.add_documents([document])
+    
+    async def add_documents(self, documents: List[ResearchDocument], batch_size: int = 64):
+        """Add documents to the knowledge base, embedding all texts in one batched pass"""
+        if not documents:
+            return
+        # IDs are content hashes, so the same paper found twice (e.g. ArXiv and Scholar) shares
+        # an ID; Chroma rejects a whole batch that repeats one. Keep the last copy of each
+        documents = list({doc.id: doc for doc in documents}.values())
+        logger.info(f"Adding {len(documents)} documents...")
+        
+        # One document-level text per document, followed by every chunk
+        texts = [f"{doc.title} {doc.abstract} {doc.content[:1000]}" for doc in documents]
+        ids, chunks, metadatas = [], [], []
+        for document in documents:
+            for i, chunk in enumerate(self._chunk_text(document.content)):
+                ids.append(f"{document.id}_chunk_{i}")
+                chunks.append(chunk)
+                metadatas.append({
+                    "doc_id": document.id,
+                    "title": document.title,
+                    "authors": json.dumps(document.authors),
+                    "source": document.source,
+                    "url": document.url or "",
+                    "chunk_index": i,
+                    "citations": document.citations
+                })
+        
+        # encode() groups inputs by length internally, keeping padding per batch low
+        embeddings = await asyncio.to_thread(self.encoder.encode, texts + chunks, batch_size=batch_size)
+        
+        # Storage only: document-level vectors live in the pickle and are never searched.
+        # Queries go through Chroma, whose HNSW index keeps float32 regardless of input dtype
+        for document, embedding in zip(documents, embeddings):
+            document.embedding = embedding.astype(np.float16)
+        
+        # Add to ChromaDB; upsert so re-adding a known document replaces its chunks
+        if chunks:
+            self.collection.upsert(
+                ids=ids,
+                documents=chunks,
+                embeddings=embeddings[len(texts):].tolist(),
+                metadatas=metadatas
             )
         
-        # Store document
-        self.documents[document.id] = document
+        # Store documents
+        for document in documents:
+            self.documents[document.id] = document
         await self._save_documents()
         
-        logger.info(f"Added document with {len(chunks)} chunks")
+        logger.info(f"Added {len(documents)} documents with {len(chunks)} chunks")
     
-    async def search(self, query: str, n_results: int = 10, include_sources: List[str] = None) -> List[Dict[str, Any]]:
+    async def embed(self, text: str) -> np.ndarray:
+        """Normalized embedding for text, computed off the event loop"""
+        return await asyncio.to_thread(self.encoder.encode, text, normalize_embeddings=True)
+    
+    async def search(self, query: str, n_results: int = 10, include_sources: List[str] = None,
+                     query_embedding: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
         """Search the knowledge base"""
         logger.info(f"Searching knowledge base: {query}")
         
         # Generate query embedding
-        query_embedding = self.encoder.encode(query).tolist()
+        if query_embedding is None:
+            query_embedding = await self.embed(query)
+        query_embedding = query_embedding.tolist()
         
         # Search ChromaDB
         results = self.collection.query(
@@ -372,10 +401,11 @@ class AdvancedRAGSystem:
         
         return search_results
     
-    async def get_enhanced_response(self, query: str, context_chunks: int = 5) -> Dict[str, Any]:
+    async def get_enhanced_response(self, query: str, context_chunks: int = 5,
+                                    query_embedding: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """Get enhanced response with RAG context"""
         # Search for relevant documents
-        search_results = await self.search(query, n_results=context_chunks)
+        search_results = await self.search(query, n_results=context_chunks, query_embedding=query_embedding)
         
         # Build context
         context = []
@@ -412,20 +442,22 @@ class AdvancedRAGSystem:
         }
         
         if search_online:
-            # Search ArXiv
-            arxiv_docs = await self.search_arxiv(topic)
-            for doc in arxiv_docs:
-                await self.add_document(doc)
-            results["documents_found"].extend([doc.title for doc in arxiv_docs])
+            # Search ArXiv and Google Scholar concurrently
+            arxiv_docs, scholar_docs = await asyncio.gather(
+                self.search_arxiv(topic),
+                self.search_google_scholar(topic),
+                return_exceptions=True
+            )
+            new_docs = []
+            for source, docs in (("ArXiv", arxiv_docs), ("Scholar", scholar_docs)):
+                if isinstance(docs, Exception):
+                    logger.warning(f"{source} search failed: {docs}")
+                else:
+                    new_docs += docs
             
-            # Search Google Scholar
-            try:
-                scholar_docs = await self.search_google_scholar(topic)
-                for doc in scholar_docs:
-                    await self.add_document(doc)
-                results["documents_found"].extend([doc.title for doc in scholar_docs])
-            except Exception as e:
-                logger.warning(f"Scholar search failed: {e}")
+            # Embed and index everything found in one batch
+            await self.add_documents(new_docs)
+            results["documents_found"].extend([doc.title for doc in new_docs])
         
         # Search existing knowledge base
         local_results = await self.search(topic, n_results=20)
@@ -23,6 +23,10 @@ import requests
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# GitHub REST limits: bound in-flight calls and retry when told to back off
+GITHUB_API_CONCURRENCY = 5
+MAX_API_RETRIES = 3
+
 @dataclass
 class ResearchSession:
     """Represents a research session for tracking"""
@@ -63,6 +67,9 @@ class GitHubAutomation:
         self.auto_commit_enabled = False
         self.auto_push_enabled = False
         
+        # Shared across all outbound GitHub API calls
+        self.api_semaphore = asyncio.Semaphore(GITHUB_API_CONCURRENCY)
+        
         # Configuration
         self.config = self._load_config()
     
@@ -642,6 +649,19 @@ Advanced retrieval-augmented generation for research.
         with open(api_path, 'w') as f:
             f.write(api_content)
     
+    async def _github_post(self, url: str, headers: Dict[str, str], data: Dict[str, Any]) -> requests.Response:
+        """POST to the GitHub API, honouring Retry-After on secondary rate limits"""
+        for attempt in range(MAX_API_RETRIES + 1):
+            async with self.api_semaphore:
+                response = await asyncio.to_thread(requests.post, url, headers=headers, json=data, timeout=30)
+            
+            retry_after = response.headers.get('Retry-After')
+            if response.status_code not in (403, 429) or retry_after is None or attempt == MAX_API_RETRIES:
+                return response
+            
+            logger.warning(f"GitHub rate limited, retrying in {retry_after}s")
+            await asyncio.sleep(int(retry_after))
+    
     async def create_release(self, version: str, notes: str = ""):
         """Create a GitHub release"""
         if not self.github_token:
@@ -674,7 +694,7 @@ Advanced retrieval-augmented generation for research.
                     'prerelease': False
                 }
                 
-                response = requests.post(url, headers=headers, json=data)
+                response = await self._github_post(url, headers, data)
                 
                 if response.status_code == 201:
                     logger.info(f"Created release {version}")
@@ -18,9 +18,11 @@ import ast
 import inspect
 import importlib
 import traceback
+import time
+import functools
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Callable
-from datetime import datetime
+from datetime import datetime, timezone
 import sqlite3
 import json
 from dataclasses import dataclass, asdict
@@ -35,6 +37,11 @@ from rich.columns import Columns
 
 console = Console()
 
+@functools.lru_cache(maxsize=64)
+def _highlight(code: str, line_numbers: bool = False) -> Syntax:
+    """Build (and memoize) a highlighted Syntax renderable for Python code"""
+    return Syntax(code, "python", theme="monokai", line_numbers=line_numbers)
+
 @dataclass
 class CommandTemplate:
     name: str
@@ -53,12 +60,15 @@ class CustomCommand:
     category: str
     permissions: List[str]
     rate_limit: int
-    created_at: str
-    modified_at: str
+    created_at: int  # UNIX epoch seconds
+    modified_at: int
     version: int = 1
     active: bool = True
 
 class CommandCreator:
+    # Workspaces whose directories have already been created this process
+    _dirs_ready: set = set()
+
     def __init__(self, workspace_dir: str = "/home/nike/clean-discord-bot"):
         self.workspace_dir = Path(workspace_dir)
         self.commands_dir = self.workspace_dir / "custom_commands"
@@ -66,14 +76,21 @@ class CommandCreator:
         self.db_file = self.workspace_dir / "launcher.db"
         
         # Create directories
-        self.commands_dir.mkdir(exist_ok=True)
-        self.templates_dir.mkdir(exist_ok=True)
+        if self.workspace_dir not in CommandCreator._dirs_ready:
+            self.commands_dir.mkdir(exist_ok=True)
+            self.templates_dir.mkdir(exist_ok=True)
+            CommandCreator._dirs_ready.add(self.workspace_dir)
         
         # Initialize templates
         self.init_command_templates()
         
         # Load existing commands
         self.commands: Dict[str, CustomCommand] = self.load_commands()
+        
+        # Rendered command table, rebuilt only when the commands change
+        self._commands_version: int = 0
+        self._rendered_table: Optional[Table] = None
+        self._rendered_version: int = -1
 
     def init_command_templates(self):
         """Initialize built-in command templates"""
@@ -168,30 +185,47 @@ async def {command_name}(ctx, query: str = None):
                 name="API Request",
                 description="Command that makes external API calls",
                 category="Network",
-                template_code='''@bot.command(name='{command_name}')
+                template_code='''import aiohttp
+
+def _get_http_session():
+    """Return the bot-wide keep-alive HTTP session, creating it on first use"""
+    session = getattr(bot, "_http_session", None)
+    if session is None or session.closed:
+        if session is None:
+            # Close the shared session when the bot shuts down
+            original_close = bot.close
+            async def close():
+                await bot._http_session.close()
+                await original_close()
+            bot.close = close
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300)
+        )
+        bot._http_session = session
+    return session
+
+@bot.command(name='{command_name}')
 async def {command_name}(ctx, query: str = None):
     """Your command description here"""
-    import aiohttp
-    
     if not query:
         await ctx.send("Please provide a search query!")
         return
     
     try:
-        async with aiohttp.ClientSession() as session:
-            # Example API call - replace with your API
-            url = f"https://api.example.com/search?q={query}"
-            headers = {"User-Agent": "Discord Bot"}
-            
-            async with session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    # Process API response here
-                    result = data.get('result', 'No data')
-                    await ctx.send(f"API Result: {result}")
-                else:
-                    await ctx.send(f"API Error: {response.status}")
-                    
+        session = _get_http_session()
+        # Example API call - replace with your API
+        url = f"https://api.example.com/search?q={query}"
+        headers = {"User-Agent": "Discord Bot"}
+        
+        async with session.get(url, headers=headers) as response:
+            if response.status == 200:
+                data = await response.json()
+                # Process API response here
+                result = data.get('result', 'No data')
+                await ctx.send(f"API Result: {result}")
+            else:
+                await ctx.send(f"API Error: {response.status}")
+                
     except Exception as e:
         await ctx.send(f"Request failed: {str(e)}")''',
                 parameters=["command_name"],
@@ -202,7 +236,43 @@ async def {command_name}(ctx, query: str = None):
                 name="Math Calculator",
                 description="Command that performs calculations",
                 category="Utility",
-                template_code='''@bot.command(name='{command_name}')
+                template_code='''import operator
+from lark import Lark, Transformer, v_args
+
+@v_args(inline=True)
+class _CalcEval(Transformer):
+    """Evaluate the calculator parse tree bottom-up"""
+    add = staticmethod(operator.add)
+    sub = staticmethod(operator.sub)
+    mul = staticmethod(operator.mul)
+    div = staticmethod(operator.truediv)
+    pow = staticmethod(operator.pow)
+    neg = staticmethod(operator.neg)
+
+    def number(self, token):
+        return int(token) if token.isdigit() else float(token)
+
+# LALR(1) calculator built once at import; the parse table is cached on disk
+_CALC = Lark(r"""
+    ?start: sum
+    ?sum: product
+        | sum "+" product   -> add
+        | sum "-" product   -> sub
+    ?product: unary
+        | product "*" unary -> mul
+        | product "/" unary -> div
+    ?unary: power
+        | "-" unary         -> neg
+    ?power: atom
+        | atom "**" unary   -> pow
+    ?atom: NUMBER           -> number
+        | "(" sum ")"
+    %import common.NUMBER
+    %import common.WS_INLINE
+    %ignore WS_INLINE
+""", parser='lalr', transformer=_CalcEval(), cache=True)
+
+@bot.command(name='{command_name}')
 async def {command_name}(ctx, *, expression: str = None):
     """Calculate mathematical expressions safely"""
     if not expression:
@@ -210,31 +280,7 @@ async def {command_name}(ctx, *, expression: str = None):
         return
     
     try:
-        # Safe evaluation of mathematical expressions
-        import ast
-        import operator
-        
-        # Allowed operators
-        operators = {
-            ast.Add: operator.add,
-            ast.Sub: operator.sub,
-            ast.Mult: operator.mul,
-            ast.Div: operator.truediv,
-            ast.Pow: operator.pow,
-            ast.USub: operator.neg,
-        }
-        
-        def eval_expr(node):
-            if isinstance(node, ast.Num):
-                return node.n
-            elif isinstance(node, ast.BinOp):
-                return operators[type(node.op)](eval_expr(node.left), eval_expr(node.right))
-            elif isinstance(node, ast.UnaryOp):
-                return operators[type(node.op)](eval_expr(node.operand))
-            else:
-                raise TypeError(node)
-        
-        result = eval_expr(ast.parse(expression, mode='eval').body)
+        result = _CALC.parse(expression)
         await ctx.send(f"Result: `{expression}` = **{result}**")
         
     except Exception as e:
@@ -247,7 +293,15 @@ async def {command_name}(ctx, *, expression: str = None):
                 name="File Operations",
                 description="Command that handles file operations",
                 category="Utility",
-                template_code='''@bot.command(name='{command_name}')
+                template_code='''import os
+from pathlib import Path
+
+# Resolve the sandbox root once; commands only resolve the candidate path
+_WORKSPACE = Path("/home/nike/clean-discord-bot/user_files")
+_WORKSPACE.mkdir(exist_ok=True)
+_WORKSPACE_REAL = os.path.realpath(_WORKSPACE)
+
+@bot.command(name='{command_name}')
 async def {command_name}(ctx, action: str = None, filename: str = None):
     """Handle file operations safely"""
     if not action or not filename:
@@ -256,13 +310,12 @@ async def {command_name}(ctx, action: str = None, filename: str = None):
     
     try:
         # Secure file operations within workspace
-        workspace = Path("/home/nike/clean-discord-bot/user_files")
-        workspace.mkdir(exist_ok=True)
-        
+        workspace = _WORKSPACE
         file_path = workspace / filename
         
         # Security check - ensure file is within workspace
-        if not str(file_path.resolve()).startswith(str(workspace.resolve())):
+        real = os.path.realpath(file_path)
+        if os.path.commonpath([real, _WORKSPACE_REAL]) != _WORKSPACE_REAL:
             await ctx.send("❌ Access denied: File outside workspace")
             return
         
@@ -300,11 +353,13 @@ async def {command_name}(ctx, action: str = None, filename: str = None):
         }
         
         # Save templates to files
+        existing = set(os.listdir(self.templates_dir))
         for template_name, template in templates.items():
-            template_file = self.templates_dir / f"{template_name}.json"
-            if not template_file.exists():
-                with open(template_file, 'w') as f:
-                    json.dump(asdict(template), f, indent=2)
+            fname = f"{template_name}.json"
+            if fname in existing:
+                continue
+            with open(self.templates_dir / fname, 'w') as f:
+                json.dump(asdict(template), f, indent=2)
 
     def load_commands(self) -> Dict[str, CustomCommand]:
         """Load custom commands from database"""
@@ -320,6 +375,8 @@ async def {command_name}(ctx, action: str = None, filename: str = None):
             
             commands = {}
             for bot_name, cmd_name, code, created, modified, active in results:
+                # Legacy rows may still hold ISO strings; convert per row, the table is left untouched
+                created, modified = self._to_epoch(created), self._to_epoch(modified)
                 commands[f"{bot_name}_{cmd_name}"] = CustomCommand(
                     name=cmd_name,
                     description="Custom command",
@@ -339,6 +396,26 @@ async def {command_name}(ctx, action: str = None, filename: str = None):
             console.print(f"[red]Error loading commands: {e}[/red]")
             return {}
 
+    @staticmethod
+    def _to_epoch(value: Any) -> int:
+        """Convert a stored timestamp (epoch int or legacy ISO string) to epoch seconds.
+
+        Unparseable values become 0 so one bad row shows an odd date
+        instead of failing the whole load.
+        """
+        if value is None:
+            return int(time.time())
+        try:
+            if isinstance(value, str):
+                parsed = datetime.fromisoformat(value)
+                if parsed.tzinfo is None:
+                    # SQLite CURRENT_TIMESTAMP values are UTC
+                    parsed = parsed.replace(tzinfo=timezone.utc)
+                return int(parsed.timestamp())
+            return int(value)
+        except (TypeError, ValueError):
+            return 0
+
     def save_command(self, command: CustomCommand):
         """Save custom command to database"""
         try:
@@ -355,15 +432,16 @@ async def {command_name}(ctx, action: str = None, filename: str = None):
                 # Update existing
                 cursor.execute('''
                     UPDATE custom_commands 
-                    SET command_code = ?, modified_at = CURRENT_TIMESTAMP, active = ?
+                    SET command_code = ?, modified_at = ?, active = ?
                     WHERE bot_name = ? AND command_name = ?
-                ''', (command.code, command.active, command.bot_name, command.name))
+                ''', (command.code, int(time.time()), command.active, command.bot_name, command.name))
             else:
                 # Insert new
                 cursor.execute('''
-                    INSERT INTO custom_commands (bot_name, command_name, command_code, active)
-                    VALUES (?, ?, ?, ?)
-                ''', (command.bot_name, command.name, command.code, command.active))
+                    INSERT INTO custom_commands (bot_name, command_name, command_code, created_at, modified_at, active)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (command.bot_name, command.name, command.code,
+                      command.created_at, command.modified_at, command.active))
             
             conn.commit()
             conn.close()
@@ -373,7 +451,7 @@ async def {command_name}(ctx, action: str = None, filename: str = None):
             with open(cmd_file, 'w') as f:
                 f.write(f"# Custom Command: {command.name}\n")
                 f.write(f"# Bot: {command.bot_name}\n")
-                f.write(f"# Created: {command.created_at}\n\n")
+                f.write(f"# Created: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(command.created_at))}\n\n")
                 f.write(command.code)
                 
         except Exception as e:
@@ -423,21 +501,25 @@ async def {command_name}(ctx, action: str = None, filename: str = None):
             console.print("[yellow]No custom commands created yet.[/yellow]")
             return
         
-        table = Table(show_header=True, header_style="bold cyan")
-        table.add_column("Command")
-        table.add_column("Bot")
-        table.add_column("Category")
-        table.add_column("Status")
-        table.add_column("Created")
-        
-        for cmd_key, command in self.commands.items():
-            status = "🟢 Active" if command.active else "🔴 Inactive"
-            created = datetime.fromisoformat(command.created_at).strftime("%m-%d")
-            table.add_row(
-                command.name, command.bot_name, command.category, status, created
-            )
+        if self._rendered_version != self._commands_version:
+            table = Table(show_header=True, header_style="bold cyan")
+            table.add_column("Command")
+            table.add_column("Bot")
+            table.add_column("Category")
+            table.add_column("Status")
+            table.add_column("Created")
+            
+            for cmd_key, command in self.commands.items():
+                status = "🟢 Active" if command.active else "🔴 Inactive"
+                created = time.strftime("%m-%d", time.localtime(command.created_at))
+                table.add_row(
+                    command.name, command.bot_name, command.category, status, created
+                )
+            
+            self._rendered_table = table
+            self._rendered_version = self._commands_version
         
-        console.print(table)
+        console.print(self._rendered_table)
         console.print()
 
     def create_new_command(self, bot_configs: Dict):
@@ -474,8 +556,7 @@ async def {command_name}(ctx, action: str = None, filename: str = None):
         
         # Show code for review/editing
         console.print(f"\n[bold]Generated Code Preview:[/bold]")
-        syntax = Syntax(command_code, "python", theme="monokai", line_numbers=True)
-        console.print(syntax)
+        console.print(_highlight(command_code, line_numbers=True))
         
         if Confirm.ask("Would you like to edit this code?"):
             command_code = self.code_editor(command_code)
@@ -487,6 +568,7 @@ async def {command_name}(ctx, action: str = None, filename: str = None):
             return
         
         # Create command
+        now = int(time.time())
         command = CustomCommand(
             name=command_name,
             description=template.description,
@@ -495,11 +577,12 @@ async def {command_name}(ctx, action: str = None, filename: str = None):
             category=template.category,
             permissions=[],
             rate_limit=5,
-            created_at=datetime.now().isoformat(),
-            modified_at=datetime.now().isoformat()
+            created_at=now,
+            modified_at=now
         )
         
         self.commands[cmd_key] = command
+        self._commands_version += 1  # the cached table is stale even if the save fails
         self.save_command(command)
         
         console.print(f"[green]✅ Command {command_name} created successfully![/green]")
@@ -529,8 +612,7 @@ async def {command_name}(ctx, action: str = None, filename: str = None):
         console.print("[bold]Code Editor - Enter your code (type 'END' on a new line to finish):[/bold]")
         console.print("[dim]Current code:[/dim]")
         
-        syntax = Syntax(initial_code, "python", theme="monokai", line_numbers=True)
-        console.print(syntax)
+        console.print(_highlight(initial_code, line_numbers=True))
         console.print()
         
         console.print("[yellow]Enter new code (or press Enter to keep current):[/yellow]")
@@ -588,8 +670,7 @@ async def {command_name}(ctx, action: str = None, filename: str = None):
             
             # Show code preview
             console.print("[dim]Code Preview:[/dim]")
-            syntax = Syntax(template.template_code[:200] + "...", "python", theme="monokai")
-            console.print(syntax)
+            console.print(_highlight(template.template_code[:200] + "..."))
             console.print("-" * 50)
         
         input("\nPress Enter to continue...")
@@ -26,28 +26,100 @@ import sqlite3
 import shutil
 from dataclasses import dataclass, asdict
 import urllib.parse
-import base64
+import hashlib
+import re
+import fnmatch
+import heapq
+import functools
+import multiprocessing
 
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich.prompt import Prompt, Confirm
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, DownloadColumn
-from rich.tree import Tree
-from rich.text import Text
-from rich.columns import Columns
-from rich.json import JSON
-
-try:
-    import git
-    from git import Repo, InvalidGitRepositoryError, GitCommandError
-    GIT_AVAILABLE = True
-except ImportError:
-    GIT_AVAILABLE = False
 
 console = Console()
 
-@dataclass
+# GitPython is imported on first git operation (see _import_git)
+_git = None
+
+def _import_git():
+    """Return the GitPython module, or None if it is not installed"""
+    global _git
+    if _git is None:
+        try:
+            import git
+            _git = git
+        except ImportError:
+            _git = False
+    return _git or None
+
+# Main menu options
+_MENU_CHOICES = tuple(str(i) for i in range(9))
+
+# Maximum number of GitHub API requests in flight at once
+API_CONCURRENCY = 5
+
+# Rate limit handling
+RATE_LIMIT_FLOOR = 2           # Stop issuing requests at this many remaining
+MAX_RATE_LIMIT_WAIT = 60       # Longest we will block waiting for a reset (seconds)
+MAX_API_RETRIES = 3            # Retries on 403/429 responses carrying Retry-After
+
+# Shallow, blobless clone of the default branch; extensions only need HEAD
+SHALLOW_CLONE_OPTIONS = ["--depth=1", "--single-branch", "--filter=blob:none"]
+
+# Repository analysis patterns, matched against raw file bytes
+CMD_RE = re.compile(rb'@(?:bot|client)\.command[^\n]*')
+# Same indicator set as the original lowercase substring checks ('discord' covers 'discord.py')
+INDICATOR_RE = re.compile(rb'discord|nextcord|hikari|bot\.py|main\.py|client\.py', re.I)
+COG_RE = re.compile(rb'commands\.Cog|class\s+\w*Cog')
+MAX_SCAN_BYTES = 1024 * 1024   # Skip source files larger than 1 MiB
+SKIP_DIRS = frozenset({'.git', 'node_modules', '__pycache__', '.venv', 'venv'})
+SCAN_CHUNK_SIZE = 32           # Files per worker task when scanning in parallel
+PARALLEL_SCAN_MIN_FILES = 512  # Smaller repos scan faster than a process pool starts
+MAIN_NAMES = frozenset({'bot.py', 'main.py', 'client.py'})
+CONFIG_PATTERNS = ('config.*', '*.env*', '*.json', '*.yaml', '*.yml')
+
+@functools.lru_cache(maxsize=512)
+def _short_date(iso: str) -> str:
+    """Format an ISO timestamp as MM-DD"""
+    return datetime.fromisoformat(iso).strftime("%m-%d")
+
+@functools.lru_cache(maxsize=512)
+def _short_source(repo_url: str) -> str:
+    """Last path component of a repository URL"""
+    return repo_url.split("/")[-1] if "/" in repo_url else repo_url
+
+def _scan_files(paths: List[str]) -> List[Tuple[str, bool, List[str], bool]]:
+    """Scan source files for bot features: (path, mentions_discord, commands, has_cog).
+
+    Module-level so it can run in a worker process. Unreadable or oversized
+    files are left out of the result.
+    """
+    results = []
+    for path in paths:
+        try:
+            if os.path.getsize(path) > MAX_SCAN_BYTES:
+                continue
+            with open(path, 'rb') as f:
+                buf = f.read()
+        except OSError:
+            continue
+        
+        results.append((
+            path,
+            INDICATOR_RE.search(buf) is not None,
+            [match.decode('utf-8', 'replace').strip() for match in CMD_RE.findall(buf)],
+            COG_RE.search(buf) is not None
+        ))
+    return results
+
+# Cache lifetimes (seconds) for GitHub API responses
+SEARCH_CACHE_TTL = 3600        # search/...
+REPO_CACHE_TTL = 86400         # repos/<owner>/<name>
+README_CACHE_TTL = 604800      # repos/<owner>/<name>/readme
+
+@dataclass(slots=True)
 class GitHubRepo:
     owner: str
     name: str
@@ -61,7 +133,7 @@ class GitHubRepo:
     license: Optional[str] = None
     size: int = 0
     
-@dataclass
+@dataclass(slots=True)
 class BotExtension:
     name: str
     description: str
@@ -76,6 +148,50 @@ class BotExtension:
     last_updated: str
     active: bool = True
 
+class GitHubRateLimiter:
+    """Paces API calls using GitHub's X-RateLimit-* response headers"""
+
+    def __init__(self, floor: int = RATE_LIMIT_FLOOR, max_wait: float = MAX_RATE_LIMIT_WAIT):
+        self.floor = floor
+        self.max_wait = max_wait
+        self.remaining: Optional[int] = None  # Unknown until the first response
+        self.reset_at: float = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        # Menu actions each run in their own event loop, so bind the lock per loop
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def acquire(self) -> bool:
+        """Reserve one request, waiting for the window reset if the budget is spent.
+
+        Returns False when the reset is further away than max_wait.
+        """
+        async with self._get_lock():
+            if self.remaining is not None and self.remaining <= self.floor:
+                wait = self.reset_at - time.time()
+                if wait > self.max_wait:
+                    return False
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self.remaining = None
+            if self.remaining is not None:
+                self.remaining -= 1
+            return True
+
+    def update(self, headers):
+        """Record the budget reported by a response"""
+        try:
+            self.remaining = int(headers["X-RateLimit-Remaining"])
+            self.reset_at = float(headers["X-RateLimit-Reset"])
+        except (KeyError, ValueError):
+            pass
+
 class GitHubIntegration:
     def __init__(self, workspace_dir: str = "/home/nike/clean-discord-bot"):
         self.workspace_dir = Path(workspace_dir)
@@ -86,13 +202,24 @@ class GitHubIntegration:
         # GitHub API configuration
         self.github_api_base = "https://api.github.com"
         self.github_token = os.getenv("GITHUB_TOKEN")  # Optional for higher rate limits
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.rate_limiter = GitHubRateLimiter()
         
         # Create directories
         self.extensions_dir.mkdir(exist_ok=True)
         self.repos_dir.mkdir(exist_ok=True)
         
-        # Initialize extension registry
-        self.extensions: Dict[str, BotExtension] = self.load_extensions()
+        # Open the launcher database once and reuse the connection
+        self._conn = sqlite3.connect(self.db_file)
+        self._init_db()
+        
+        # Extension registry, loaded on first access
+        self._extensions: Optional[Dict[str, BotExtension]] = None
+        
+        # Rendered extensions table, rebuilt only when the registry changes
+        self._ext_version: int = 0
+        self._cached_table: Optional[Table] = None
+        self._cached_table_version: int = -1
         
         # Popular Discord bot repositories (curated list)
         self.featured_repos = [
@@ -108,84 +235,247 @@ class GitHubIntegration:
             "AbstractUmbra/GuildConfigBot"
         ]
 
+    @property
+    def extensions(self) -> Dict[str, BotExtension]:
+        """Installed extensions, loaded from the database on first access"""
+        if self._extensions is None:
+            self._extensions = self.load_extensions()
+        return self._extensions
+
+    def _row_to_extension(self, row: Tuple) -> BotExtension:
+        """Build a BotExtension from a module_registry row"""
+        name, mod_type, source, install_date, version, deps = row
+        return BotExtension(
+            name=name,
+            description="Discord bot extension",
+            category="Extension",
+            repo_url=source,
+            local_path=str(self.extensions_dir / name),
+            version=version or "unknown",
+            author="",
+            dependencies=json.loads(deps) if deps else [],
+            commands=[],
+            installed_at=install_date,
+            last_updated=install_date
+        )
+
     def load_extensions(self) -> Dict[str, BotExtension]:
         """Load installed extensions from database"""
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            cursor.execute('''
+            results = self._conn.execute('''
                 SELECT module_name, module_type, source_repo, install_date, version, dependencies
                 FROM module_registry WHERE module_type = 'extension'
-            ''')
-            results = cursor.fetchall()
-            conn.close()
-            
-            extensions = {}
-            for name, mod_type, source, install_date, version, deps in results:
-                extensions[name] = BotExtension(
-                    name=name,
-                    description="Discord bot extension",
-                    category="Extension",
-                    repo_url=source,
-                    local_path=str(self.extensions_dir / name),
-                    version=version or "unknown",
-                    author="",
-                    dependencies=json.loads(deps) if deps else [],
-                    commands=[],
-                    installed_at=install_date,
-                    last_updated=install_date
-                )
+            ''').fetchall()
             
-            return extensions
+            return {row[0]: self._row_to_extension(row) for row in results}
             
         except Exception as e:
             console.print(f"[red]Error loading extensions: {e}[/red]")
             return {}
 
+    def get_extension(self, name: str) -> Optional[BotExtension]:
+        """Look up a single installed extension by name"""
+        if self._extensions is not None:
+            return self._extensions.get(name)
+        
+        try:
+            row = self._conn.execute('''
+                SELECT module_name, module_type, source_repo, install_date, version, dependencies
+                FROM module_registry WHERE module_type = 'extension' AND module_name = ? LIMIT 1
+            ''', (name,)).fetchone()
+            return self._row_to_extension(row) if row else None
+            
+        except Exception as e:
+            console.print(f"[red]Error loading extension {name}: {e}[/red]")
+            return None
+
     def save_extension(self, extension: BotExtension):
         """Save extension info to database"""
+        self.save_extensions([extension])
+
+    def save_extensions(self, extensions: List[BotExtension]):
+        """Save several extensions in a single transaction"""
+        rows = [
+            (ext.name, 'extension', ext.repo_url, ext.version, json.dumps(ext.dependencies))
+            for ext in extensions
+        ]
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO module_registry 
-                (module_name, module_type, source_repo, version, dependencies)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
-                extension.name, 
-                'extension',
-                extension.repo_url,
-                extension.version,
-                json.dumps(extension.dependencies)
-            ))
-            
-            conn.commit()
-            conn.close()
+            with self._conn:
+                self._conn.executemany('''
+                    INSERT OR REPLACE INTO module_registry 
+                    (module_name, module_type, source_repo, version, dependencies)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', rows)
             
         except Exception as e:
             console.print(f"[red]Error saving extension: {e}[/red]")
 
-    async def github_api_request(self, endpoint: str) -> Optional[Dict]:
-        """Make GitHub API request with rate limiting"""
-        url = f"{self.github_api_base}/{endpoint.lstrip('/')}"
-        headers = {"Accept": "application/vnd.github.v3+json"}
+    def _init_db(self):
+        """Tune the launcher database and create the API response cache table"""
+        try:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA temp_store=MEMORY")
+            self._conn.execute("PRAGMA cache_size=-20000")
+            with self._conn:
+                self._conn.execute('''
+                    CREATE TABLE IF NOT EXISTS gh_api_cache (
+                        endpoint TEXT PRIMARY KEY,
+                        body BLOB,
+                        fetched_at REAL,
+                        ttl REAL,
+                        etag TEXT
+                    )
+                ''')
+        except Exception as e:
+            console.print(f"[red]Error initializing database: {e}[/red]")
         
-        if self.github_token:
-            headers["Authorization"] = f"token {self.github_token}"
+        try:
+            with self._conn:
+                self._conn.execute("ALTER TABLE gh_api_cache ADD COLUMN etag TEXT")
+        except sqlite3.OperationalError:
+            pass  # Column already present
         
         try:
-            async with aiohttp.ClientSession() as session:
+            with self._conn:
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_mr_name ON module_registry(module_name)"
+                )
+        except sqlite3.OperationalError:
+            pass  # module_registry has not been created by the launcher yet
+
+    @staticmethod
+    def api_cache_ttl(endpoint: str) -> float:
+        """Pick a cache lifetime based on the kind of endpoint"""
+        if endpoint.startswith("search/"):
+            return SEARCH_CACHE_TTL
+        if endpoint.endswith("/readme"):
+            return README_CACHE_TTL
+        return REPO_CACHE_TTL
+
+    def get_cached_response(self, cache_key: str) -> Optional[Tuple[Any, Optional[str], bool]]:
+        """Return (body, etag, is_fresh) for a cached API response, or None"""
+        try:
+            row = self._conn.execute('''
+                SELECT body, etag, fetched_at + ttl > ? FROM gh_api_cache WHERE endpoint = ?
+            ''', (time.time(), cache_key)).fetchone()
+            return (json.loads(row[0]), row[1], bool(row[2])) if row else None
+        except Exception:
+            return None
+
+    def cache_response(self, cache_key: str, data: Any, ttl: float, etag: Optional[str] = None):
+        """Store an API response in the cache"""
+        try:
+            with self._conn:
+                self._conn.execute('''
+                    INSERT OR REPLACE INTO gh_api_cache (endpoint, body, fetched_at, ttl, etag)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (cache_key, json.dumps(data), time.time(), ttl, etag))
+        except Exception as e:
+            console.print(f"[red]Error caching API response: {e}[/red]")
+
+    def refresh_cached_response(self, cache_key: str):
+        """Mark a cached response as fresh again after a 304 Not Modified"""
+        try:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE gh_api_cache SET fetched_at = ? WHERE endpoint = ?",
+                    (time.time(), cache_key)
+                )
+        except Exception as e:
+            console.print(f"[red]Error caching API response: {e}[/red]")
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared keep-alive API session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            headers = {"Accept": "application/vnd.github.v3+json"}
+            if self.github_token:
+                headers["Authorization"] = f"token {self.github_token}"
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300, keepalive_timeout=75),
+                headers=headers
+            )
+        return self._session
+
+    async def close(self):
+        """Close the shared API session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def run_async(self, coro):
+        """Run a menu coroutine, closing the API session before its event loop ends"""
+        async def runner():
+            try:
+                return await coro
+            finally:
+                await self.close()
+        return asyncio.run(runner())
+
+    async def github_api_request(self, endpoint: str, raw_lines: Optional[int] = None) -> Optional[Any]:
+        """Make GitHub API request with rate limiting and response caching
+
+        With raw_lines set, the raw file body is requested instead of JSON and
+        only its first raw_lines lines are read and returned as text.
+        """
+        endpoint = endpoint.lstrip('/')
+        cache_id = endpoint if raw_lines is None else f"{endpoint}#raw:{raw_lines}"
+        cache_key = hashlib.sha256(cache_id.encode()).hexdigest()
+        cached = self.get_cached_response(cache_key)
+        if cached is not None and cached[2]:
+            return cached[0]
+        
+        url = f"{self.github_api_base}/{endpoint}"
+        
+        # Revalidate stale entries; 304 responses don't count against the rate limit
+        headers = {}
+        if raw_lines is not None:
+            headers["Accept"] = "application/vnd.github.raw"
+        if cached is not None and cached[1]:
+            headers["If-None-Match"] = cached[1]
+        
+        try:
+            session = await self._get_session()
+            for attempt in range(MAX_API_RETRIES + 1):
+                if not await self.rate_limiter.acquire():
+                    console.print("[red]GitHub API rate limit exceeded. Set GITHUB_TOKEN for higher limits.[/red]")
+                    return None
+                
+                retry_after = None
                 async with session.get(url, headers=headers) as response:
+                    self.rate_limiter.update(response.headers)
+                    
                     if response.status == 200:
-                        return await response.json()
-                    elif response.status == 403:
-                        console.print("[red]GitHub API rate limit exceeded. Set GITHUB_TOKEN for higher limits.[/red]")
-                        return None
+                        if raw_lines is None:
+                            data = await response.json()
+                        else:
+                            # Stop reading once enough lines have arrived
+                            lines = []
+                            async for line in response.content:
+                                lines.append(line)
+                                if len(lines) >= raw_lines:
+                                    break
+                            data = b"".join(lines).decode("utf-8", "replace")
+                        self.cache_response(
+                            cache_key, data, self.api_cache_ttl(endpoint), response.headers.get("ETag")
+                        )
+                        return data
+                    elif response.status == 304 and cached is not None:
+                        self.refresh_cached_response(cache_key)
+                        return cached[0]
+                    elif response.status in (403, 429):
+                        if "Retry-After" in response.headers and attempt < MAX_API_RETRIES:
+                            retry_after = float(response.headers["Retry-After"])
+                        else:
+                            console.print("[red]GitHub API rate limit exceeded. Set GITHUB_TOKEN for higher limits.[/red]")
+                            return None
                     else:
                         console.print(f"[red]GitHub API error: {response.status}[/red]")
                         return None
-                        
+                
+                # Secondary rate limit: honor Retry-After with exponential backoff
+                await asyncio.sleep(max(retry_after, 2 ** attempt))
+                    
         except Exception as e:
             console.print(f"[red]GitHub API request failed: {e}[/red]")
             return None
@@ -210,22 +500,22 @@ class GitHubIntegration:
             console.print("8. 📋 Import/Export Config")
             console.print("0. ⬅️ Back to Main Menu")
             
-            choice = Prompt.ask("Choose option", choices=[str(i) for i in range(9)])
+            choice = Prompt.ask("Choose option", choices=_MENU_CHOICES)
             
             if choice == "0":
                 break
             elif choice == "1":
-                asyncio.run(self.discover_extensions())
+                self.run_async(self.discover_extensions())
             elif choice == "2":
-                asyncio.run(self.clone_repository())
+                self.run_async(self.clone_repository())
             elif choice == "3":
-                asyncio.run(self.install_extension())
+                self.run_async(self.install_extension())
             elif choice == "4":
                 self.update_extensions()
             elif choice == "5":
                 self.manage_repositories()
             elif choice == "6":
-                asyncio.run(self.extension_marketplace())
+                self.run_async(self.extension_marketplace())
             elif choice == "7":
                 self.repository_settings()
             elif choice == "8":
@@ -237,21 +527,25 @@ class GitHubIntegration:
             console.print("[yellow]No extensions installed yet.[/yellow]")
             return
         
-        table = Table(show_header=True, header_style="bold cyan")
-        table.add_column("Extension")
-        table.add_column("Version")
-        table.add_column("Source")
-        table.add_column("Status")
-        table.add_column("Updated")
-        
-        for name, ext in self.extensions.items():
-            status = "🟢 Active" if ext.active else "🔴 Inactive"
-            updated = datetime.fromisoformat(ext.last_updated).strftime("%m-%d") if ext.last_updated else "N/A"
-            source_short = ext.repo_url.split("/")[-1] if "/" in ext.repo_url else ext.repo_url
+        if self._cached_table_version != self._ext_version:
+            table = Table(show_header=True, header_style="bold cyan")
+            table.add_column("Extension")
+            table.add_column("Version")
+            table.add_column("Source")
+            table.add_column("Status")
+            table.add_column("Updated")
+            
+            for name, ext in self.extensions.items():
+                status = "🟢 Active" if ext.active else "🔴 Inactive"
+                updated = _short_date(ext.last_updated) if ext.last_updated else "N/A"
+                source_short = _short_source(ext.repo_url)
+                
+                table.add_row(name, ext.version, source_short, status, updated)
             
-            table.add_row(name, ext.version, source_short, status, updated)
+            self._cached_table = table
+            self._cached_table_version = self._ext_version
         
-        console.print(table)
+        console.print(self._cached_table)
         console.print()
 
     async def discover_extensions(self):
@@ -259,6 +553,7 @@ class GitHubIntegration:
         console.clear()
         console.print(Panel.fit("[bold cyan]🔍 Discovering Discord Bot Extensions[/bold cyan]"))
         
+        from rich.progress import Progress, SpinnerColumn, TextColumn
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
@@ -266,33 +561,45 @@ class GitHubIntegration:
         ) as progress:
             task = progress.add_task("Searching GitHub for Discord bot extensions...", total=None)
             
-            # Search for Discord bot repositories
+            # Search for Discord bot repositories; qualifiers let GitHub filter server-side
             search_queries = [
-                "discord bot python",
-                "discord.py bot",
-                "discord bot commands",
-                "discord bot modules"
+                f"{query} language:python stars:>50 in:name,description"
+                for query in (
+                    "discord bot python",
+                    "discord.py bot",
+                    "discord bot commands",
+                    "discord bot modules"
+                )
             ]
             
+            # The searches are independent, so run them concurrently
+            sem = asyncio.Semaphore(API_CONCURRENCY)
+            
+            async def bounded_search(query: str) -> List[GitHubRepo]:
+                async with sem:
+                    progress.update(task, description=f"Searching: {query}")
+                    repos = await self.search_github_repos(query, per_page=10)
+                    return repos
+            
             all_repos = []
-            for query in search_queries:
-                progress.update(task, description=f"Searching: {query}")
-                repos = await self.search_github_repos(query, per_page=10)
-                if repos:
-                    all_repos.extend(repos)
-                time.sleep(1)  # Rate limiting
+            for repos in await asyncio.gather(*map(bounded_search, search_queries)):
+                all_repos.extend(repos)
         
         if not all_repos:
             console.print("[red]No repositories found or API error.[/red]")
             input("Press Enter to continue...")
             return
         
-        # Remove duplicates and sort by stars
-        unique_repos = {repo.name: repo for repo in all_repos}
-        sorted_repos = sorted(unique_repos.values(), key=lambda x: x.stars, reverse=True)
+        # Remove duplicates, keeping the most-starred repository per name
+        unique_repos: Dict[str, GitHubRepo] = {}
+        for repo in all_repos:
+            existing = unique_repos.get(repo.name)
+            if existing is None or repo.stars > existing.stars:
+                unique_repos[repo.name] = repo
+        top_repos = heapq.nlargest(20, unique_repos.values(), key=lambda x: x.stars)
         
         # Display results
-        console.print(f"\n[bold green]Found {len(sorted_repos)} Discord Bot Repositories:[/bold green]\n")
+        console.print(f"\n[bold green]Found {len(unique_repos)} Discord Bot Repositories:[/bold green]\n")
         
         table = Table(show_header=True, header_style="bold")
         table.add_column("Name", style="cyan")
@@ -301,7 +608,7 @@ class GitHubIntegration:
         table.add_column("Language")
         table.add_column("Updated")
         
-        for repo in sorted_repos[:20]:  # Show top 20
+        for repo in top_repos:  # Show top 20
             updated = datetime.fromisoformat(repo.updated_at.replace('Z', '+00:00')).strftime("%m-%d")
             description = (repo.description[:50] + "...") if len(repo.description) > 50 else repo.description
             table.add_row(
@@ -318,7 +625,7 @@ class GitHubIntegration:
         if Confirm.ask("\nWould you like to clone one of these repositories?"):
             repo_choice = Prompt.ask("Enter repository name (owner/name)")
             selected_repo = None
-            for repo in sorted_repos:
+            for repo in unique_repos.values():
                 if f"{repo.owner}/{repo.name}" == repo_choice:
                     selected_repo = repo
                     break
@@ -357,6 +664,62 @@ class GitHubIntegration:
         
         return repos
 
+    async def git_clone(self, repo_url: str, local_path: Path, full_history: bool = False):
+        """Clone a repository (shallow unless full_history) without blocking the event loop"""
+        options = [] if full_history else SHALLOW_CLONE_OPTIONS
+        git = _import_git()
+        if git:
+            await asyncio.to_thread(
+                git.Repo.clone_from, repo_url, local_path, multi_options=options
+            )
+        else:
+            # Fallback to git command
+            process = await asyncio.create_subprocess_exec(
+                "git", "clone", *options, repo_url, str(local_path),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            _, stderr = await process.communicate()
+            
+            if process.returncode != 0:
+                raise Exception(stderr.decode(errors="replace"))
+
+    async def git_sync(self, local_path: Path) -> bool:
+        """Fast-forward an existing clone to its remote branch tip, fetching only the delta.
+
+        Returns False if local_path is not a usable git repository. Full-history
+        clones are fetched normally so their history is not truncated.
+        """
+        depth = ["--depth=1"] if (local_path / ".git" / "shallow").exists() else []
+        git = _import_git()
+        if git:
+            def sync():
+                try:
+                    repo = git.Repo(local_path)
+                    branch = repo.active_branch.name
+                except (git.InvalidGitRepositoryError, TypeError):
+                    return False
+                repo.git.fetch('origin', branch, *depth)
+                repo.git.reset('--hard', f'origin/{branch}')
+                return True
+            return await asyncio.to_thread(sync)
+        
+        # Fallback to git command
+        for args in (["fetch", *depth, "origin"], ["reset", "--hard", "@{upstream}"]):
+            process = await asyncio.create_subprocess_exec(
+                "git", "-C", str(local_path), *args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            _, stderr = await process.communicate()
+            
+            if process.returncode != 0:
+                message = stderr.decode(errors="replace")
+                if "not a git repository" in message:
+                    return False
+                raise Exception(message)
+        return True
+
     async def clone_repository(self):
         """Clone a repository by URL"""
         console.print("[bold cyan]📥 Clone GitHub Repository[/bold cyan]")
@@ -374,85 +737,77 @@ class GitHubIntegration:
         
         # Extract repository name for local directory
         repo_name = repo_url.split("/")[-1].replace(".git", "")
-        local_path = self.repos_dir / repo_name
-        
-        if local_path.exists():
-            console.print(f"[yellow]Repository {repo_name} already exists locally.[/yellow]")
-            if not Confirm.ask("Overwrite existing repository?"):
-                return
-            shutil.rmtree(local_path)
-        
-        # Clone repository
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            DownloadColumn(),
-            transient=True,
-        ) as progress:
-            task = progress.add_task(f"Cloning {repo_name}...", total=None)
-            
-            try:
-                if GIT_AVAILABLE:
-                    Repo.clone_from(repo_url, local_path)
-                else:
-                    # Fallback to git command
-                    result = subprocess.run([
-                        "git", "clone", repo_url, str(local_path)
-                    ], capture_output=True, text=True)
-                    
-                    if result.returncode != 0:
-                        raise Exception(result.stderr)
-                
-                console.print(f"[green]✅ Repository {repo_name} cloned successfully![/green]")
-                
-                # Analyze repository for Discord bot features
-                await self.analyze_repository(local_path, repo_url)
-                
-            except Exception as e:
-                console.print(f"[red]❌ Failed to clone repository: {e}[/red]")
+        await self._clone(repo_url, self.repos_dir / repo_name, repo_url)
         
         input("Press Enter to continue...")
 
     async def clone_specific_repo(self, repo: GitHubRepo):
         """Clone a specific repository from search results"""
-        local_path = self.repos_dir / repo.name
-        
-        if local_path.exists():
-            if not Confirm.ask(f"Repository {repo.name} exists. Overwrite?"):
-                return
-            shutil.rmtree(local_path)
+        await self._clone(repo.clone_url, self.repos_dir / repo.name, repo.url)
+
+    async def _clone(self, url: str, dest: Path, analyze_url: str) -> bool:
+        """Clone (or update) a repository into dest and analyze it for bot features"""
+        repo_name = dest.name
+        synced = False
         
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            transient=True,
-        ) as progress:
-            task = progress.add_task(f"Cloning {repo.name}...", total=None)
+        if dest.exists():
+            console.print(f"[yellow]Repository {repo_name} already exists locally.[/yellow]")
+            if (dest / ".git").exists() and Confirm.ask("Fetch latest changes instead of re-cloning?", default=True):
+                try:
+                    synced = await self.git_sync(dest)
+                except Exception as e:
+                    console.print(f"[red]❌ Failed to update repository: {e}[/red]")
+                    return False
+                if not synced:
+                    console.print("[yellow]Could not update the existing checkout.[/yellow]")
+            # Deleting the directory may discard local work, so it always needs confirmation
+            if not synced:
+                if not Confirm.ask("Overwrite existing repository?"):
+                    return False
+                shutil.rmtree(dest)
+        
+        if synced:
+            console.print(f"[green]✅ Repository {repo_name} updated![/green]")
+        else:
+            full_history = Confirm.ask("Clone full history? (default is a shallow clone)", default=False)
             
-            try:
-                if GIT_AVAILABLE:
-                    Repo.clone_from(repo.clone_url, local_path)
-                else:
-                    result = subprocess.run([
-                        "git", "clone", repo.clone_url, str(local_path)
-                    ], capture_output=True, text=True)
-                    
-                    if result.returncode != 0:
-                        raise Exception(result.stderr)
-                
-                console.print(f"[green]✅ Repository {repo.name} cloned successfully![/green]")
+            from rich.progress import Progress, SpinnerColumn, TextColumn
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                transient=True,
+            ) as progress:
+                progress.add_task(f"Cloning {repo_name}...", total=None)
                 
-                # Analyze for bot features
-                await self.analyze_repository(local_path, repo.url)
-                
-            except Exception as e:
-                console.print(f"[red]❌ Failed to clone repository: {e}[/red]")
+                try:
+                    await self.git_clone(url, dest, full_history)
+                except Exception as e:
+                    console.print(f"[red]❌ Failed to clone repository: {e}[/red]")
+                    return False
+            
+            console.print(f"[green]✅ Repository {repo_name} cloned successfully![/green]")
+        
+        # Analyze repository for Discord bot features
+        await self.analyze_repository(dest, analyze_url)
+        return True
 
     async def analyze_repository(self, repo_path: Path, repo_url: str):
         """Analyze repository for Discord bot features"""
         console.print(f"\n[bold]🔍 Analyzing repository structure...[/bold]")
         
+        # The walk and file reads are blocking, so keep them off the event loop
+        analysis = await asyncio.to_thread(self._scan_files_sync, repo_path)
+        
+        # Display analysis results
+        self.display_repository_analysis(analysis, repo_path.name)
+        
+        # Offer to install as extension
+        if analysis['is_discord_bot']:
+            if Confirm.ask("This appears to be a Discord bot. Install as extension?"):
+                await self.install_as_extension(repo_path, repo_url, analysis)
+
+    def _scan_files_sync(self, repo_path: Path) -> Dict:
+        """Walk and scan a repository, returning the analysis dict"""
         analysis = {
             'is_discord_bot': False,
             'main_files': [],
@@ -462,69 +817,72 @@ class GitHubIntegration:
             'config_files': []
         }
         
-        # Check for common Discord bot patterns
-        discord_indicators = [
-            'discord.py', 'discord', 'nextcord', 'hikari',
-            'bot.py', 'main.py', 'client.py'
+        # Classify files in a single walk, pruning VCS/dependency directories
+        python_files = []
+        has_requirements = False
+        root = str(repo_path)
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+            python_files.extend(Path(dirpath) / f for f in filenames if f.endswith(".py"))
+            
+            # Requirements and config files are only looked for at the top level
+            if dirpath == root:
+                has_requirements = "requirements.txt" in filenames
+                analysis['config_files'] = [
+                    f for f in filenames
+                    if any(fnmatch.fnmatch(f, pattern) for pattern in CONFIG_PATTERNS)
+                ]
+        
+        # Scan sources, spreading large repositories across worker processes
+        chunks = [
+            [str(p) for p in python_files[i:i + SCAN_CHUNK_SIZE]]
+            for i in range(0, len(python_files), SCAN_CHUNK_SIZE)
         ]
+        if len(python_files) >= PARALLEL_SCAN_MIN_FILES:
+            from concurrent.futures import ProcessPoolExecutor
+            # This runs on a to_thread worker; forking a multi-threaded process can deadlock
+            methods = multiprocessing.get_all_start_methods()
+            mp_context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            with ProcessPoolExecutor(mp_context=mp_context) as executor:
+                chunk_results = list(executor.map(_scan_files, chunks))
+        else:
+            chunk_results = [_scan_files(chunk) for chunk in chunks]
         
-        python_files = list(repo_path.glob("**/*.py"))
-        
-        for file_path in python_files:
-            try:
-                content = file_path.read_text(encoding='utf-8')
+        for results in chunk_results:
+            for path, mentions_discord, commands, has_cog in results:
+                file_path = Path(path)
                 
                 # Check for Discord bot indicators
-                if any(indicator in content.lower() for indicator in discord_indicators):
+                if mentions_discord:
                     analysis['is_discord_bot'] = True
                 
                 # Look for main bot files
-                if any(pattern in file_path.name.lower() for pattern in ['bot.py', 'main.py', 'client.py']):
+                if file_path.name.lower() in MAIN_NAMES:
                     analysis['main_files'].append(str(file_path.relative_to(repo_path)))
                 
                 # Look for command definitions
-                if '@bot.command' in content or '@client.command' in content:
-                    analysis['commands'].extend([
-                        line.strip() for line in content.split('\n')
-                        if '@bot.command' in line or '@client.command' in line
-                    ])
+                analysis['commands'].extend(commands)
                 
                 # Look for cogs
-                if 'commands.Cog' in content or 'class' in content and 'Cog' in content:
+                if has_cog:
                     analysis['cogs'].append(str(file_path.relative_to(repo_path)))
-                    
-            except Exception:
-                continue
         
         # Check for requirements.txt
-        req_file = repo_path / "requirements.txt"
-        if req_file.exists():
+        if has_requirements:
             try:
-                requirements = req_file.read_text().strip().split('\n')
+                requirements = (repo_path / "requirements.txt").read_text().strip().split('\n')
                 analysis['requirements'] = [req.strip() for req in requirements if req.strip()]
             except Exception:
                 pass
         
-        # Check for config files
-        for config_pattern in ['config.*', '*.env*', '*.json', '*.yaml', '*.yml']:
-            analysis['config_files'].extend([
-                str(f.relative_to(repo_path)) for f in repo_path.glob(config_pattern)
-                if f.is_file()
-            ])
-        
-        # Display analysis results
-        self.display_repository_analysis(analysis, repo_path.name)
-        
-        # Offer to install as extension
-        if analysis['is_discord_bot']:
-            if Confirm.ask("This appears to be a Discord bot. Install as extension?"):
-                await self.install_as_extension(repo_path, repo_url, analysis)
+        return analysis
 
     def display_repository_analysis(self, analysis: Dict, repo_name: str):
         """Display repository analysis results"""
         console.print(f"\n[bold]📊 Analysis Results for {repo_name}:[/bold]")
         
         # Create analysis tree
+        from rich.tree import Tree
         tree = Tree("📁 Repository Analysis")
         
         if analysis['is_discord_bot']:
@@ -591,6 +949,7 @@ class GitHubIntegration:
         
         # Save extension
         self.extensions[extension_name] = extension
+        self._ext_version += 1  # the cached overview table is stale even if the save fails
         self.save_extension(extension)
         
         console.print(f"[green]✅ Extension {extension_name} installed successfully![/green]")
@@ -602,6 +961,7 @@ class GitHubIntegration:
         
         console.print("[bold]🔥 Featured Repositories:[/bold]\n")
         
+        from rich.progress import Progress, SpinnerColumn, TextColumn
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
@@ -609,14 +969,17 @@ class GitHubIntegration:
         ) as progress:
             task = progress.add_task("Loading featured repositories...", total=len(self.featured_repos))
             
-            featured_info = []
-            for repo in self.featured_repos:
-                progress.update(task, description=f"Fetching {repo}")
-                info = await self.get_repo_info(repo)
-                if info:
-                    featured_info.append(info)
-                progress.advance(task)
-                time.sleep(0.5)  # Rate limiting
+            sem = asyncio.Semaphore(API_CONCURRENCY)
+            
+            async def bounded_fetch(repo: str) -> Optional[GitHubRepo]:
+                async with sem:
+                    progress.update(task, description=f"Fetching {repo}")
+                    info = await self.get_repo_info(repo)
+                    progress.advance(task)
+                    return info
+            
+            results = await asyncio.gather(*map(bounded_fetch, self.featured_repos))
+            featured_info = [info for info in results if info]
         
         # Display featured repositories
         table = Table(show_header=True, header_style="bold")
@@ -706,35 +1069,34 @@ class GitHubIntegration:
         if choice == "1":
             await self.clone_specific_repo(repo)
         elif choice == "2":
-            os.system(f"xdg-open {repo.url}")
+            subprocess.Popen(
+                ["xdg-open", repo.url],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True
+            )
         elif choice == "3":
             await self.view_repository_readme(repo)
 
     async def view_repository_readme(self, repo: GitHubRepo):
         """View repository README"""
         endpoint = f"repos/{repo.owner}/{repo.name}/readme"
-        data = await self.github_api_request(endpoint)
+        # Fetch one line past what is shown so truncation can be detected
+        data = await self.github_api_request(endpoint, raw_lines=51)
         
         if not data:
             console.print("[red]README not found.[/red]")
             return
         
-        try:
-            # Decode base64 content
-            readme_content = base64.b64decode(data['content']).decode('utf-8')
-            
-            console.clear()
-            console.print(Panel.fit(f"[bold]📄 README: {repo.name}[/bold]"))
-            
-            # Show first 50 lines
-            lines = readme_content.split('\n')[:50]
-            console.print('\n'.join(lines))
-            
-            if len(readme_content.split('\n')) > 50:
-                console.print("\n[dim]... (README truncated)[/dim]")
-                
-        except Exception as e:
-            console.print(f"[red]Error decoding README: {e}[/red]")
+        console.clear()
+        console.print(Panel.fit(f"[bold]📄 README: {repo.name}[/bold]"))
+        
+        # Show first 50 lines
+        lines = data.splitlines()
+        console.print('\n'.join(lines[:50]))
+        
+        if len(lines) > 50:
+            console.print("\n[dim]... (README truncated)[/dim]")
         
         input("\nPress Enter to continue...")
 
@@ -6,22 +6,434 @@ Bridges Discord bot with 84 specialized AI agents and Ollama
 
 import argparse
 import asyncio
-import json
-import sys
-import time
-import subprocess
-import os
 from pathlib import Path
-import yaml
-import ollama
-import random
+import hashlib
+import re
+import sqlite3
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import AsyncGenerator, List, Mapping, Optional, Tuple
+
+import aiohttp
+import numpy as np
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
+
+# Embedding model used for semantic cache lookups
+EMBED_MODEL = 'nomic-embed-text'
+# Ollama degrades badly with concurrent generations; cap in-flight calls from one bridge run
+MAX_CONCURRENT_OLLAMA = 2
+# Keep agent models resident between requests
+KEEP_ALIVE = '30m'
+# Context window for agent calls; chain hops carry the previous hop's output
+NUM_CTX = 4096
+# Research routing: agents scoring above the threshold are consulted, within these bounds
+ROUTING_THRESHOLD = 0.4
+MIN_RESEARCH_AGENTS = 2
+MAX_RESEARCH_AGENTS = 6
+
+class OllamaHTTPClient:
+    """Minimal async Ollama REST client.
+
+    Kept in this file so the bridge can be copied and run as a standalone
+    script; the bots shell out to it from outside the repository.
+    """
+    
+    def __init__(self, host: str):
+        self.host = host
+        self.session: Optional[aiohttp.ClientSession] = None
+    
+    def _session(self) -> aiohttp.ClientSession:
+        # Created on first use because the connector needs a running loop
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=64, keepalive_timeout=300),
+                timeout=aiohttp.ClientTimeout(total=300)
+            )
+        return self.session
+    
+    async def close(self):
+        """Close the underlying HTTP session"""
+        if self.session and not self.session.closed:
+            await self.session.close()
+    
+    async def list_models(self) -> List[dict]:
+        """Installed models; raises if Ollama is unreachable"""
+        async with self._session().get(f"{self.host}/api/tags") as response:
+            response.raise_for_status()
+            return _json_loads(await response.read()).get('models', [])
+    
+    async def embeddings(self, prompt: str, model: str) -> List[float]:
+        """Embedding vector for prompt (empty list on failure)"""
+        try:
+            async with self._session().post(
+                f"{self.host}/api/embeddings", json={'model': model, 'prompt': prompt}
+            ) as response:
+                if response.status != 200:
+                    return []
+                return _json_loads(await response.read()).get('embedding', [])
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return []
+    
+    async def chat(self, messages: List[dict], model: str, stream: bool = True,
+                   keep_alive: Optional[str] = None, options: Optional[dict] = None) -> AsyncGenerator[str, None]:
+        """Yield response content; failures are reported in-band as a ❌ message"""
+        payload = {'model': model, 'messages': messages, 'stream': stream, 'options': options or {}}
+        if keep_alive is not None:
+            payload['keep_alive'] = keep_alive
+        
+        try:
+            async with self._session().post(f"{self.host}/api/chat", json=payload) as response:
+                if response.status != 200:
+                    yield f"❌ Chat API error: {response.status} - {await response.text()}"
+                    return
+                
+                if not stream:
+                    yield _json_loads(await response.read()).get('message', {}).get('content', '')
+                    return
+                
+                # Newline-delimited JSON, one chunk per line
+                async for line in response.content:
+                    if not line.strip():
+                        continue
+                    chunk = _json_loads(line)
+                    yield chunk.get('message', {}).get('content', '')
+                    if chunk.get('done'):
+                        break
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            yield f"❌ Chat error: {str(e)}"
+    
+    async def prime(self, messages: List[dict], model: str, keep_alive: Optional[str] = None,
+                    options: Optional[dict] = None) -> bool:
+        """Evaluate a prompt prefix so the model is loaded and its KV cache is resident"""
+        payload = {
+            'model': model,
+            'messages': messages,
+            'stream': False,
+            'options': {**(options or {}), 'num_predict': 1}
+        }
+        if keep_alive is not None:
+            payload['keep_alive'] = keep_alive
+        
+        try:
+            async with self._session().post(f"{self.host}/api/chat", json=payload) as response:
+                await response.read()
+                return response.status == 200
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+
+class SemanticResponseCache:
+    """Bounded LLM response cache: exact key match first, then embedding similarity.
+
+    Entries are scoped by (agent, model, system prompt) so a semantic hit can
+    only return a response produced under the same agent configuration.
+    """
+    
+    def __init__(self, db_path: Path, max_entries: int = 512, threshold: float = 0.92):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.threshold = threshold
+        # key -> (scope, response, normalized embedding or None)
+        self.entries: OrderedDict = OrderedDict()
+        self.load()
+    
+    @staticmethod
+    def make_key(scope: str, query: str) -> str:
+        normalized = " ".join(query.lower().split())
+        return hashlib.sha256(f"{scope}\0{normalized}".encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Exact-match lookup"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+    
+    def get_similar(self, scope: str, vector: np.ndarray) -> Optional[str]:
+        """Return the cached response whose query embedding is closest, if above threshold"""
+        candidates = [(k, e) for k, e in self.entries.items() if e[0] == scope and e[2] is not None]
+        if not candidates:
+            return None
+        
+        scores = np.stack([e[2] for _, e in candidates]) @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        
+        key, entry = candidates[best]
+        self.entries.move_to_end(key)
+        return entry[1]
+    
+    def put(self, key: str, scope: str, response: str, vector: Optional[np.ndarray]):
+        self.entries[key] = (scope, response, vector)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+    
+    def load(self):
+        """Warm the cache from SQLite"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    scope TEXT,
+                    response TEXT,
+                    embedding BLOB,
+                    position INTEGER
+                )
+            ''')
+            rows = conn.execute(
+                "SELECT key, scope, response, embedding FROM response_cache ORDER BY position LIMIT ?",
+                (self.max_entries,)
+            ).fetchall()
+            conn.close()
+        except sqlite3.Error:
+            return
+        
+        for key, scope, response, blob in rows:
+            vector = np.frombuffer(blob, dtype=np.float32) if blob else None
+            self.entries[key] = (scope, response, vector)
+    
+    def save(self):
+        """Persist the cache (in LRU order) to SQLite"""
+        rows = [
+            (key, scope, response, vector.astype(np.float32).tobytes() if vector is not None else None, i)
+            for i, (key, (scope, response, vector)) in enumerate(self.entries.items())
+        ]
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path)
+            with conn:
+                conn.execute("DELETE FROM response_cache")
+                conn.executemany(
+                    "INSERT INTO response_cache (key, scope, response, embedding, position) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+class ResearchTemplateCache:
+    """Reuses research responses across a recurring topic family.
+
+    When a new topic sits in a cluster of at least min_members similar past
+    topics, the closest past response is re-targeted by swapping the old
+    topic phrase for the new one. The result is only used if it passes
+    validation; otherwise the caller falls back to a full LLM call.
+    """
+    
+    def __init__(self, db_path: Path, threshold: float = 0.88, min_members: int = 3, max_per_agent: int = 64):
+        self.db_path = db_path
+        self.threshold = threshold
+        self.min_members = min_members
+        self.max_per_agent = max_per_agent
+        # agent -> [(topic, response, normalized topic embedding)]
+        self.templates: dict = {}
+        self.load()
+    
+    @staticmethod
+    def _keywords(text: str) -> set:
+        return {w for w in re.findall(r"[a-z0-9]+", text.lower()) if len(w) > 3}
+    
+    def render(self, agent_name: str, topic: str, vector: np.ndarray) -> Optional[str]:
+        """Return a re-targeted cached response for topic, or None"""
+        entries = self.templates.get(agent_name)
+        if not entries or len(entries) < self.min_members:
+            return None
+        
+        scores = np.stack([e[2] for e in entries]) @ vector
+        members = np.flatnonzero(scores >= self.threshold)
+        if len(members) < self.min_members:
+            return None
+        
+        old_topic, template, _ = entries[int(members[np.argmax(scores[members])])]
+        rendered, replaced = re.subn(re.escape(old_topic), lambda _: topic, template, flags=re.IGNORECASE)
+        if not replaced:
+            return None
+        
+        # Validate: no distinctive terms of the old topic survive, and the
+        # length is in line with the rest of the cluster
+        stale = self._keywords(old_topic) - self._keywords(topic)
+        if stale & self._keywords(rendered):
+            return None
+        lengths = sorted(len(entries[i][1]) for i in members)
+        median = lengths[len(lengths) // 2]
+        if not 0.5 * median <= len(rendered) <= 2 * median:
+            return None
+        
+        return rendered
+    
+    def add(self, agent_name: str, topic: str, response: str, vector: np.ndarray):
+        entries = self.templates.setdefault(agent_name, [])
+        entries.append((topic, response, vector))
+        if len(entries) > self.max_per_agent:
+            del entries[0]
+    
+    def load(self):
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS research_templates (
+                    agent TEXT,
+                    topic TEXT,
+                    response TEXT,
+                    embedding BLOB,
+                    position INTEGER
+                )
+            ''')
+            rows = conn.execute(
+                "SELECT agent, topic, response, embedding FROM research_templates ORDER BY position"
+            ).fetchall()
+            conn.close()
+        except sqlite3.Error:
+            return
+        
+        for agent_name, topic, response, blob in rows:
+            self.add(agent_name, topic, response, np.frombuffer(blob, dtype=np.float32))
+    
+    def save(self):
+        rows = [
+            (agent_name, topic, response, vector.astype(np.float32).tobytes(), i)
+            for agent_name, entries in self.templates.items()
+            for i, (topic, response, vector) in enumerate(entries)
+        ]
+        try:
+            conn = sqlite3.connect(self.db_path)
+            with conn:
+                conn.execute("DELETE FROM research_templates")
+                conn.executemany(
+                    "INSERT INTO research_templates (agent, topic, response, embedding, position) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+# General purpose AI agents
+_AGENTS_RAW = {
+    # Coding & Development
+    'python-developer': {
+        'name': 'Python Developer',
+        'description': 'Python programming, web development, scripting',
+        'category': 'coding',
+        'model': 'llama3.2:3b',
+        'prompt': 'You are a helpful Python developer with expertise in web development, automation, and general programming. Provide clear, practical coding solutions.'
+    },
+    'web-developer': {
+        'name': 'Web Developer',
+        'description': 'HTML, CSS, JavaScript, responsive design',
+        'category': 'coding',
+        'model': 'llama3.2:3b',
+        'prompt': 'You are a web developer expert in HTML, CSS, JavaScript, and modern web technologies. Help with frontend development and design.'
+    },
+    'backend-developer': {
+        'name': 'Backend Developer',
+        'description': 'APIs, databases, server architecture',
+        'category': 'coding',
+        'model': 'llama3.2:3b',
+        'prompt': 'You are a backend developer specializing in APIs, databases, and server-side programming. Provide guidance on backend architecture and implementation.'
+    },
+
+    # Creative & Content
+    'content-writer': {
+        'name': 'Content Writer',
+        'description': 'Writing, editing, content creation, storytelling',
+        'category': 'creative',
+        'model': 'llama3.2:3b',
+        'prompt': 'You are a creative content writer skilled in crafting engaging articles, stories, and various forms of written content. Help with writing tasks and creative projects.'
+    },
+    'designer': {
+        'name': 'Designer',
+        'description': 'UI/UX design, graphics, visual concepts',
+        'category': 'creative',
+        'model': 'llama3.2:3b',
+        'prompt': 'You are a designer with expertise in UI/UX, graphic design, and visual aesthetics. Provide design advice and creative solutions.'
+    },
+
+    # Business & Analysis
+    'business-advisor': {
+        'name': 'Business Advisor',
+        'description': 'Strategy, planning, market analysis',
+        'category': 'business',
+        'model': 'llama3.2:3b',
+        'prompt': 'You are a business advisor with expertise in strategy, planning, and market analysis. Provide practical business guidance and insights.'
+    },
+    'project-manager': {
+        'name': 'Project Manager',
+        'description': 'Project planning, team coordination, workflow optimization',
+        'category': 'business',
+        'model': 'llama3.2:3b',
+        'prompt': 'You are a project manager expert in planning, coordination, and workflow optimization. Help with project management and team organization.'
+    },
+
+    # Learning & Education
+    'tutor': {
+        'name': 'Learning Tutor',
+        'description': 'Education, explanations, skill development',
+        'category': 'education',
+        'model': 'llama3.2:3b',
+        'prompt': 'You are a helpful tutor who excels at explaining complex topics in simple terms. Provide educational guidance and learning support.'
+    },
+
+    # General Assistant
+    'general-assistant': {
+        'name': 'General Assistant',
+        'description': 'General questions, everyday tasks, problem solving',
+        'category': 'general',
+        'model': 'llama3.2:3b',
+        'prompt': 'You are a helpful general assistant ready to help with various questions and tasks. Provide clear, practical, and friendly assistance.'
+    },
+
+    # Tech Support
+    'tech-helper': {
+        'name': 'Tech Helper',
+        'description': 'Technical troubleshooting, software help, IT support',
+        'category': 'tech',
+        'model': 'llama3.2:3b',
+        'prompt': 'You are a tech support specialist who helps with computer problems, software issues, and general technical troubleshooting.'
+    }
+}
+
+@dataclass(slots=True, frozen=True)
+class Agent:
+    """An agent definition; system_prompt is fixed so Ollama can reuse its prefix"""
+    name: str
+    description: str
+    category: str
+    model: str
+    prompt: str
+    system_prompt: str
+
+AGENTS: Mapping[str, Agent] = MappingProxyType({
+    key: Agent(**raw, system_prompt=f"{raw['prompt']}\n\nContext: You are {raw['name']} - {raw['description']}")
+    for key, raw in _AGENTS_RAW.items()
+})
 
 class OllamaAgentBridge:
     def __init__(self):
         self.ollama_host = "http://localhost:11434"
+        self.client = OllamaHTTPClient(self.ollama_host)
         self.agents_dir = Path.home() / ".config/warp/plugins/agents/agents"
         self.available_agents = self.load_agents()
         
+        # Response cache, persisted between runs for warm starts
+        cache_db = Path.home() / ".config/warp/agent_response_cache.db"
+        cache_db.parent.mkdir(parents=True, exist_ok=True)
+        self.cache_db = cache_db
+        self._agent_vectors: Optional[np.ndarray] = None
+        self.response_cache = SemanticResponseCache(cache_db)
+        self.research_templates = ResearchTemplateCache(cache_db)
+        self._embeddings_available = True
+        self._ollama_slots = asyncio.Semaphore(MAX_CONCURRENT_OLLAMA)
+        
         # Model mapping for different agent types
         self.model_mapping = {
             'security': 'llama3.2:3b',
@@ -32,119 +444,152 @@ class OllamaAgentBridge:
             'default': 'llama3.2:3b'
         }
     
-    def load_agents(self):
-        """Load available agents from markdown files"""
-        agents = {}
-        
-        # General purpose AI agents
-        mock_agents = {
-            # Coding & Development
-            'python-developer': {
-                'name': 'Python Developer',
-                'description': 'Python programming, web development, scripting',
-                'category': 'coding',
-                'model': 'llama3.2:3b',
-                'prompt': 'You are a helpful Python developer with expertise in web development, automation, and general programming. Provide clear, practical coding solutions.'
-            },
-            'web-developer': {
-                'name': 'Web Developer',
-                'description': 'HTML, CSS, JavaScript, responsive design',
-                'category': 'coding',
-                'model': 'llama3.2:3b',
-                'prompt': 'You are a web developer expert in HTML, CSS, JavaScript, and modern web technologies. Help with frontend development and design.'
-            },
-            'backend-developer': {
-                'name': 'Backend Developer',
-                'description': 'APIs, databases, server architecture',
-                'category': 'coding',
-                'model': 'llama3.2:3b',
-                'prompt': 'You are a backend developer specializing in APIs, databases, and server-side programming. Provide guidance on backend architecture and implementation.'
-            },
-            
-            # Creative & Content
-            'content-writer': {
-                'name': 'Content Writer',
-                'description': 'Writing, editing, content creation, storytelling',
-                'category': 'creative',
-                'model': 'llama3.2:3b',
-                'prompt': 'You are a creative content writer skilled in crafting engaging articles, stories, and various forms of written content. Help with writing tasks and creative projects.'
-            },
-            'designer': {
-                'name': 'Designer',
-                'description': 'UI/UX design, graphics, visual concepts',
-                'category': 'creative',
-                'model': 'llama3.2:3b',
-                'prompt': 'You are a designer with expertise in UI/UX, graphic design, and visual aesthetics. Provide design advice and creative solutions.'
-            },
-            
-            # Business & Analysis
-            'business-advisor': {
-                'name': 'Business Advisor',
-                'description': 'Strategy, planning, market analysis',
-                'category': 'business',
-                'model': 'llama3.2:3b',
-                'prompt': 'You are a business advisor with expertise in strategy, planning, and market analysis. Provide practical business guidance and insights.'
-            },
-            'project-manager': {
-                'name': 'Project Manager',
-                'description': 'Project planning, team coordination, workflow optimization',
-                'category': 'business',
-                'model': 'llama3.2:3b',
-                'prompt': 'You are a project manager expert in planning, coordination, and workflow optimization. Help with project management and team organization.'
-            },
-            
-            # Learning & Education
-            'tutor': {
-                'name': 'Learning Tutor',
-                'description': 'Education, explanations, skill development',
-                'category': 'education',
-                'model': 'llama3.2:3b',
-                'prompt': 'You are a helpful tutor who excels at explaining complex topics in simple terms. Provide educational guidance and learning support.'
-            },
-            
-            # General Assistant
-            'general-assistant': {
-                'name': 'General Assistant',
-                'description': 'General questions, everyday tasks, problem solving',
-                'category': 'general',
-                'model': 'llama3.2:3b',
-                'prompt': 'You are a helpful general assistant ready to help with various questions and tasks. Provide clear, practical, and friendly assistance.'
-            },
-            
-            # Tech Support
-            'tech-helper': {
-                'name': 'Tech Helper',
-                'description': 'Technical troubleshooting, software help, IT support',
-                'category': 'tech',
-                'model': 'llama3.2:3b',
-                'prompt': 'You are a tech support specialist who helps with computer problems, software issues, and general technical troubleshooting.'
+    def load_agents(self) -> Mapping[str, Agent]:
+        """Load available agents"""
+        return AGENTS
+    
+    async def embed(self, text: str) -> Optional[np.ndarray]:
+        """Return a normalized embedding for text, or None if embeddings are unavailable"""
+        if not self._embeddings_available:
+            return None
+        embedding = await self.client.embeddings(text, EMBED_MODEL)
+        if not embedding:
+            # Embedding model not pulled / not supported: fall back to exact matching
+            self._embeddings_available = False
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+    
+    async def agent_vectors(self) -> Optional[np.ndarray]:
+        """Normalized (N, D) description embeddings for all agents, in available_agents order"""
+        if self._agent_vectors is not None:
+            return self._agent_vectors
+        
+        texts = {name: f"{agent.description} {agent.prompt}" for name, agent in self.available_agents.items()}
+        digests = {name: hashlib.sha256(f"{EMBED_MODEL}\0{text}".encode()).hexdigest() for name, text in texts.items()}
+        
+        # Reuse embeddings from earlier runs while the agent text is unchanged
+        try:
+            conn = sqlite3.connect(self.cache_db)
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS agent_embeddings (
+                    agent TEXT PRIMARY KEY,
+                    digest TEXT,
+                    embedding BLOB
+                )
+            ''')
+            stored = {
+                agent: np.frombuffer(blob, dtype=np.float32)
+                for agent, digest, blob in conn.execute("SELECT agent, digest, embedding FROM agent_embeddings")
+                if digests.get(agent) == digest
             }
-        }
+        except sqlite3.Error:
+            conn, stored = None, {}
         
-        return mock_agents
+        missing = [name for name in texts if name not in stored]
+        vectors = await asyncio.gather(*(self.embed(texts[name]) for name in missing))
+        if any(v is None for v in vectors):
+            if conn:
+                conn.close()
+            return None
+        stored.update(zip(missing, vectors))
+        
+        if conn:
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO agent_embeddings (agent, digest, embedding) VALUES (?, ?, ?)",
+                        [(name, digests[name], stored[name].astype(np.float32).tobytes()) for name in missing]
+                    )
+            except sqlite3.Error:
+                pass
+            conn.close()
+        
+        self._agent_vectors = np.stack([stored[name] for name in texts])
+        return self._agent_vectors
+    
+    async def route_research(self, topic_vector: Optional[np.ndarray], default: List[str]) -> List[str]:
+        """Pick the agents most relevant to a topic, falling back to default without embeddings"""
+        vectors = await self.agent_vectors() if topic_vector is not None else None
+        if vectors is None:
+            return default
+        
+        scores = vectors @ topic_vector
+        k = int(np.count_nonzero(scores >= ROUTING_THRESHOLD))
+        k = min(MAX_RESEARCH_AGENTS, max(MIN_RESEARCH_AGENTS, k))
+        names = list(self.available_agents)
+        return [names[i] for i in np.argsort(scores)[::-1][:k]]
+    
+    async def warm_up(self) -> str:
+        """Prime every agent's system prompt in Ollama so later calls reuse its KV prefix"""
+        agents = list(self.available_agents.values())
+        primed = await asyncio.gather(*(
+            self.client.prime(
+                [{'role': 'system', 'content': agent.system_prompt}],
+                model=agent.model,
+                keep_alive=KEEP_ALIVE,
+                options={'num_ctx': NUM_CTX}
+            )
+            for agent in agents
+        ))
+        
+        return f"🔥 Primed {sum(primed)}/{len(agents)} agents"
     
-    async def query_agent(self, agent_name: str, query: str) -> str:
-        """Query a specific agent"""
+    async def chat(self, agent_name: str, prompt: str) -> str:
+        """Run a single non-streaming chat completion"""
+        agent = self.available_agents[agent_name]
+        messages = [
+            {'role': 'system', 'content': agent.system_prompt},
+            {'role': 'user', 'content': prompt}
+        ]
+        content = ""
+        async with self._ollama_slots:
+            async for token in self.client.chat(
+                messages, model=agent.model, stream=False, keep_alive=KEEP_ALIVE, options={'num_ctx': NUM_CTX}
+            ):
+                content += token
+        return content
+    
+    async def query_agent(self, agent_name: str, query: str, cache: bool = True,
+                          template: Optional[str] = None, query_vector: Optional[np.ndarray] = None) -> str:
+        """Query a specific agent.
+
+        template wraps the raw query into the prompt ("...: {}"). The cache is
+        matched on the raw query only, scoped to the agent, model, system
+        prompt and template, so boilerplate shared by every prompt cannot make
+        unrelated questions look alike.
+        """
         if agent_name not in self.available_agents:
             return f"❌ Agent '{agent_name}' not found"
         
         agent = self.available_agents[agent_name]
-        model = agent.get('model', 'llama3.2:3b')
+        model = agent.model
+        prompt = template.format(query) if template else query
         
         try:
-            # Create context with agent specialization
-            system_prompt = f"{agent['prompt']}\n\nContext: You are responding as {agent['name']} - {agent['description']}"
+            system_prompt = agent.system_prompt
             
-            # Use ollama client
-            response = ollama.chat(
-                model=model,
-                messages=[
-                    {'role': 'system', 'content': system_prompt},
-                    {'role': 'user', 'content': query}
-                ]
-            )
+            content = None
+            if cache:
+                scope_digest = hashlib.sha256(f"{system_prompt}\0{template or ''}".encode()).hexdigest()
+                scope = f"{agent_name}|{model}|{scope_digest}"
+                key = self.response_cache.make_key(scope, query)
+                content = self.response_cache.get(key)
+                vector = query_vector
+                if content is None:
+                    if vector is None:
+                        vector = await self.embed(query)
+                    if vector is not None:
+                        content = self.response_cache.get_similar(scope, vector)
+            
+            if content is None:
+                content = await self.chat(agent_name, prompt)
+                # The client reports failures in-band; never cache those
+                if cache and not content.startswith("❌"):
+                    self.response_cache.put(key, scope, content, vector)
             
-            result = f"🤖 **{agent['name']}** ({agent['category']})\n\n{response['message']['content']}\n\n*Model: {model}*"
+            result = f"🤖 **{agent.name}** ({agent.category})\n\n{content}\n\n*Model: {model}*"
             return result
             
         except Exception as e:
@@ -159,51 +604,69 @@ class OllamaAgentBridge:
         if invalid:
             return f"❌ Invalid agents: {', '.join(invalid)}"
         
+        results = []
+        async for step, partial_text in self.stream_chain(agents, query):
+            if step == len(results):
+                results.append(partial_text)
+            else:
+                results[step] = partial_text
+        
+        # Format chain results
+        parts = [
+            "🔗 **Multi-Agent Analysis Chain**\n",
+            f"**Query**: {query}\n",
+            f"**Agent Chain**: {' → '.join(agents)}\n\n"
+        ]
+        
+        for i, (agent_name, result) in enumerate(zip(agents, results)):
+            agent = self.available_agents[agent_name]
+            parts.append(f"**Step {i+1}: {agent.name}**\n{result}\n\n")
+            if i < len(results) - 1:
+                parts.append("---\n\n")
+        
+        return "".join(parts)
+    
+    async def stream_chain(self, agents: List[str], query: str) -> AsyncGenerator[Tuple[int, str], None]:
+        """Run an agent chain, yielding (step_index, partial_text) as tokens arrive.
+
+        Each hop starts as soon as the previous one finishes streaming.
+        """
         results = []
         current_input = query
         
         for i, agent_name in enumerate(agents):
             agent = self.available_agents[agent_name]
             
-            # For chaining, modify the prompt to consider previous results
             if i > 0:
-                chain_prompt = f"Previous analysis from {agents[i-1]}:\n{results[-1]}\n\nBased on this previous analysis, please provide your specialized perspective on: {current_input}"
+                hop_input = f"Previous analysis from {agents[i-1]}:\n{results[-1]}\n\nBased on this previous analysis, please provide your specialized perspective on: {current_input}"
             else:
-                chain_prompt = current_input
+                hop_input = current_input
+            
+            # Chain context goes in the user message; the system prompt stays fixed
+            chain_context = f"You are step {i+1} of {len(agents)} in a multi-agent analysis chain. Provide your specialized expertise."
+            messages = [
+                {'role': 'system', 'content': agent.system_prompt},
+                {'role': 'user', 'content': f"{chain_context}\n\n{hop_input}"}
+            ]
             
+            agent_result = ""
             try:
-                system_prompt = f"{agent['prompt']}\n\nContext: You are part of a multi-agent analysis chain. Provide your specialized expertise."
-                
-                response = ollama.chat(
-                    model=agent.get('model', 'llama3.2:3b'),
-                    messages=[
-                        {'role': 'system', 'content': system_prompt},
-                        {'role': 'user', 'content': chain_prompt}
-                    ]
-                )
+                async with self._ollama_slots:
+                    async for token in self.client.chat(
+                        messages, model=agent.model, stream=True, keep_alive=KEEP_ALIVE, options={'num_ctx': NUM_CTX}
+                    ):
+                        agent_result += token
+                        yield i, agent_result
+                if not agent_result:
+                    yield i, agent_result
                 
-                agent_result = response['message']['content']
                 results.append(agent_result)
-                
                 # Use this result as input for next agent
                 current_input = agent_result
                 
             except Exception as e:
                 results.append(f"❌ Error in {agent_name}: {str(e)}")
-        
-        # Format chain results
-        output = f"🔗 **Multi-Agent Analysis Chain**\n"
-        output += f"**Query**: {query}\n"
-        output += f"**Agent Chain**: {' → '.join(agents)}\n\n"
-        
-        for i, (agent_name, result) in enumerate(zip(agents, results)):
-            agent = self.available_agents[agent_name]
-            output += f"**Step {i+1}: {agent['name']}**\n"
-            output += f"{result}\n\n"
-            if i < len(results) - 1:
-                output += "---\n\n"
-        
-        return output
+                yield i, results[-1]
     
     async def autonomous_research(self, topic: str) -> str:
         """Conduct collaborative analysis using multiple agents"""
@@ -217,45 +680,69 @@ class OllamaAgentBridge:
         if not available_research_agents:
             return "❌ No analysis agents available"
         
-        results = {}
-        research_queries = {
-            'general-assistant': f"Provide a comprehensive overview and analysis of: {topic}",
-            'business-advisor': f"Analyze the business and strategic aspects of: {topic}",
-            'content-writer': f"Create an informative summary about: {topic}",
-            'tutor': f"Explain the key concepts and learning points about: {topic}"
+        # Prompt templates; the topic is filled in by query_agent
+        research_templates = {
+            'general-assistant': "Provide a comprehensive overview and analysis of: {}",
+            'business-advisor': "Analyze the business and strategic aspects of: {}",
+            'content-writer': "Create an informative summary about: {}",
+            'tutor': "Explain the key concepts and learning points about: {}"
         }
         
-        # Query each research agent independently
-        for agent_name in available_research_agents:
-            if agent_name in research_queries:
-                query = research_queries[agent_name]
-                result = await self.query_agent(agent_name, query)
-                results[agent_name] = result
+        # Route the topic to the most relevant agents; without embeddings use the fixed panel
+        topic_vector = await self.embed(topic)
+        agent_names = await self.route_research(topic_vector, available_research_agents)
+        for agent_name in agent_names:
+            research_templates.setdefault(agent_name, "Analyze {} from the perspective of your expertise")
+        
+        # Recurring topic families can be served from validated templates
+        results = {}
+        if topic_vector is not None:
+            for agent_name in agent_names:
+                rendered = self.research_templates.render(agent_name, topic, topic_vector)
+                if rendered is not None:
+                    agent = self.available_agents[agent_name]
+                    results[agent_name] = f"🤖 **{agent.name}** ({agent.category})\n\n{rendered}"
+        
+        # Query the remaining research agents concurrently; they are independent
+        pending = [a for a in agent_names if a not in results]
+        responses = await asyncio.gather(
+            *(self.query_agent(a, topic, template=research_templates[a], query_vector=topic_vector) for a in pending),
+            return_exceptions=True
+        )
+        for agent_name, result in zip(pending, responses):
+            if isinstance(result, Exception):
+                result = f"❌ Error querying {agent_name}: {str(result)}"
+            elif topic_vector is not None and not result.startswith("❌"):
+                self.research_templates.add(agent_name, topic, result.split('\n\n', 1)[-1], topic_vector)
+            results[agent_name] = result
+        # Keep the report in routing order
+        results = {a: results[a] for a in agent_names}
         
         # Synthesize results
-        output = f"🧠 **Autonomous Research Report**\n"
-        output += f"**Research Topic**: {topic}\n"
-        output += f"**Agents Consulted**: {len(results)}\n\n"
+        parts = [
+            "🧠 **Autonomous Research Report**\n",
+            f"**Research Topic**: {topic}\n",
+            f"**Agents Consulted**: {len(results)}\n\n"
+        ]
         
         for agent_name, result in results.items():
             agent = self.available_agents[agent_name]
-            output += f"### {agent['name']} Analysis\n"
             # Extract just the content without the header
             content = result.split('\n\n', 1)[1] if '\n\n' in result else result
-            output += f"{content}\n\n"
+            parts.append(f"### {agent.name} Analysis\n{content}\n\n")
         
         # Add synthesis
-        output += "### 🎯 Key Insights Summary\n"
-        output += f"Based on multi-agent analysis of '{topic}', key themes emerge around data patterns, business implications, risk factors, and security considerations. This comprehensive analysis provides multiple expert perspectives for informed decision-making.\n"
+        parts.append("### 🎯 Key Insights Summary\n")
+        parts.append(f"Based on multi-agent analysis of '{topic}', key themes emerge around data patterns, business implications, risk factors, and security considerations. This comprehensive analysis provides multiple expert perspectives for informed decision-making.\n")
         
-        return output
+        return "".join(parts)
     
     async def get_status(self) -> str:
         """Get system status"""
         try:
             # Check Ollama
-            models = ollama.list()
-            ollama_status = f"✅ Ollama running with {len(models['models'])} models"
+            models = await self.client.list_models()
+            ollama_status = f"✅ Ollama running with {len(models)} models"
         except Exception as e:
             ollama_status = f"❌ Ollama error: {str(e)}"
         
@@ -266,8 +753,8 @@ class OllamaAgentBridge:
     async def get_models(self) -> str:
         """Get available models"""
         try:
-            models = ollama.list()
-            model_list = "\n".join([f"• {m['name']} ({m['size']})" for m in models['models']])
+            models = await self.client.list_models()
+            model_list = "\n".join([f"• {m['name']} ({m['size']})" for m in models])
             return f"**Available Models**\n{model_list}"
         except Exception as e:
             return f"❌ Error getting models: {str(e)}"
@@ -280,16 +767,53 @@ async def main():
     parser.add_argument('--research', help='Research topic for autonomous analysis')
     parser.add_argument('--status', action='store_true', help='Get system status')
     parser.add_argument('--models', action='store_true', help='List available models')
+    parser.add_argument('--stream', action='store_true', help='Stream chain output as it is generated')
+    parser.add_argument('--warmup', action='store_true', help='Prime agent system prompts in Ollama')
     
     args = parser.parse_args()
     bridge = OllamaAgentBridge()
     
-    if args.status:
+    try:
+        result = await run_command(bridge, args)
+    finally:
+        bridge.response_cache.save()
+        bridge.research_templates.save()
+        await bridge.client.close()
+    
+    if result:
+        print(result)
+
+async def print_chain_stream(bridge: OllamaAgentBridge, agents: List[str], query: str):
+    """Print chain tokens to stdout as they arrive"""
+    printed = 0
+    current_step = -1
+    async for step, partial_text in bridge.stream_chain(agents, query):
+        if step != current_step:
+            current_step, printed = step, 0
+            agent = bridge.available_agents[agents[step]]
+            print(f"\n\n**Step {step+1}: {agent.name}**\n", flush=True)
+        print(partial_text[printed:], end="", flush=True)
+        printed = len(partial_text)
+    print()
+
+async def run_command(bridge: OllamaAgentBridge, args) -> str:
+    """Dispatch the parsed CLI arguments to the bridge"""
+    
+    if args.warmup:
+        result = await bridge.warm_up()
+    elif args.status:
         result = await bridge.get_status()
     elif args.models:
         result = await bridge.get_models()
     elif args.agent and args.query:
         result = await bridge.query_agent(args.agent, args.query)
+    elif args.chain and args.query and args.stream:
+        agents = [a.strip() for a in args.chain.split(',')]
+        invalid = [a for a in agents if a not in bridge.available_agents]
+        if invalid:
+            return f"❌ Invalid agents: {', '.join(invalid)}"
+        await print_chain_stream(bridge, agents, args.query)
+        result = ""
     elif args.chain and args.query:
         result = await bridge.chain_agents(args.chain, args.query)
     elif args.research:
@@ -297,7 +821,7 @@ async def main():
     else:
         result = "❌ Invalid arguments. Use --help for usage."
     
-    print(result)
+    return result
 
 if __name__ == "__main__":
     asyncio.run(main())
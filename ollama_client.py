@@ -1,21 +1,51 @@
 import asyncio
 import aiohttp
-import json
 import logging
+import time
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
 from typing import Dict, List, Optional, AsyncGenerator
 from config import config
 
 logger = logging.getLogger(__name__)
 
+# Minimum seconds between repeated pull progress updates
+PULL_STATUS_INTERVAL = 1.0
+
+async def _iter_json_lines(response: aiohttp.ClientResponse) -> AsyncGenerator[Dict, None]:
+    """Parse a newline-delimited JSON stream, skipping malformed lines"""
+    buffer = bytearray()
+    async for data in response.content.iter_any():
+        buffer += data
+        start = 0
+        while (end := buffer.find(b'\n', start)) != -1:
+            line = buffer[start:end]
+            start = end + 1
+            if line.strip():
+                try:
+                    yield _json_loads(line)
+                except ValueError:
+                    continue
+        del buffer[:start]
+    
+    if buffer.strip():
+        try:
+            yield _json_loads(buffer)
+        except ValueError:
+            pass
+
 class OllamaClient:
     def __init__(self, host: str = None):
         self.host = host or config.OLLAMA_HOST
         self.session: Optional[aiohttp.ClientSession] = None
+        self._session_lock: Optional[asyncio.Lock] = None
         
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=300)
-        )
+        await self._ensure_session()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -23,10 +53,30 @@ class OllamaClient:
             await self.session.close()
     
     async def _ensure_session(self):
-        if not self.session or self.session.closed:
-            self.session = aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=300)
-            )
+        if self.session and not self.session.closed:
+            return
+        
+        # The connector needs a running loop, so the lock and session are created lazily
+        if self._session_lock is None:
+            self._session_lock = asyncio.Lock()
+        async with self._session_lock:
+            if not self.session or self.session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=64,
+                    limit_per_host=32,
+                    keepalive_timeout=300,
+                    enable_cleanup_closed=True
+                )
+                self.session = aiohttp.ClientSession(
+                    connector=connector,
+                    headers={'Connection': 'keep-alive'},
+                    timeout=aiohttp.ClientTimeout(total=300)
+                )
+    
+    async def close(self):
+        """Close the underlying HTTP session"""
+        if self.session and not self.session.closed:
+            await self.session.close()
     
     async def list_models(self) -> List[Dict]:
         """List available models"""
@@ -34,7 +84,7 @@ class OllamaClient:
         try:
             async with self.session.get(f"{self.host}/api/tags") as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = _json_loads(await response.read())
                     return data.get('models', [])
                 return []
         except Exception as e:
@@ -84,18 +134,13 @@ class OllamaClient:
                     return
                 
                 if stream:
-                    async for line in response.content:
-                        if line:
-                            try:
-                                chunk = json.loads(line.decode('utf-8'))
-                                if 'response' in chunk:
-                                    yield chunk['response']
-                                if chunk.get('done', False):
-                                    break
-                            except json.JSONDecodeError:
-                                continue
+                    async for chunk in _iter_json_lines(response):
+                        if 'response' in chunk:
+                            yield chunk['response']
+                        if chunk.get('done', False):
+                            break
                 else:
-                    data = await response.json()
+                    data = _json_loads(await response.read())
                     if 'response' in data:
                         yield data['response']
                         
@@ -141,18 +186,13 @@ class OllamaClient:
                     return
                 
                 if stream:
-                    async for line in response.content:
-                        if line:
-                            try:
-                                chunk = json.loads(line.decode('utf-8'))
-                                if 'message' in chunk and 'content' in chunk['message']:
-                                    yield chunk['message']['content']
-                                if chunk.get('done', False):
-                                    break
-                            except json.JSONDecodeError:
-                                continue
+                    async for chunk in _iter_json_lines(response):
+                        if 'message' in chunk and 'content' in chunk['message']:
+                            yield chunk['message']['content']
+                        if chunk.get('done', False):
+                            break
                 else:
-                    data = await response.json()
+                    data = _json_loads(await response.read())
                     if 'message' in data and 'content' in data['message']:
                         yield data['message']['content']
                         
@@ -176,18 +216,18 @@ class OllamaClient:
                     yield f"❌ Failed to pull model: {response.status}"
                     return
                 
-                async for line in response.content:
-                    if line:
-                        try:
-                            chunk = json.loads(line.decode('utf-8'))
-                            status = chunk.get('status', '')
-                            if status:
-                                yield f"📥 {status}"
-                            if chunk.get('completed'):
-                                yield f"✅ Model {model_name} downloaded successfully!"
-                                break
-                        except json.JSONDecodeError:
-                            continue
+                # Progress lines arrive far faster than anyone can read them;
+                # report a status change immediately, repeats at most once per interval
+                last_status, last_emit = None, 0.0
+                async for chunk in _iter_json_lines(response):
+                    status = chunk.get('status', '')
+                    now = time.monotonic()
+                    if status and (status != last_status or now - last_emit >= PULL_STATUS_INTERVAL):
+                        last_status, last_emit = status, now
+                        yield f"📥 {status}"
+                    if chunk.get('completed'):
+                        yield f"✅ Model {model_name} downloaded successfully!"
+                        break
                             
         except Exception as e:
             logger.error(f"Error pulling model: {e}")
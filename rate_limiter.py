@@ -1,96 +1,83 @@
-import asyncio
+import math
 import time
-from collections import defaultdict, deque
 from typing import Dict, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Sweep idle users once this many are tracked
+MAX_TRACKED_USERS = 10_000
+# Slack for float rounding when comparing backlogs
+EPSILON = 1e-9
+
 class RateLimiter:
+    """Per-user token bucket: max_requests burst, refilled evenly over window_seconds.
+
+    The bucket is stored in GCRA form as a single float per user: the
+    monotonic time at which it will be full again. State updates contain no
+    await points, so they are atomic on the event loop and need no lock.
+    """
+
     def __init__(self, max_requests: int = 10, window_seconds: int = 60):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.user_requests: Dict[int, deque] = defaultdict(deque)
-        self._lock = asyncio.Lock()
-    
+        self.interval = window_seconds / max_requests  # seconds to refill one token
+        # user_id -> time the bucket is full again
+        self.user_full_at: Dict[int, float] = {}
+        self._sweep_at = MAX_TRACKED_USERS
+
     async def is_rate_limited(self, user_id: int) -> Tuple[bool, int]:
         """
         Check if user is rate limited.
         Returns: (is_limited, seconds_until_reset)
         """
-        async with self._lock:
-            current_time = time.time()
-            user_queue = self.user_requests[user_id]
-            
-            # Remove old requests outside the window
-            while user_queue and user_queue[0] < current_time - self.window_seconds:
-                user_queue.popleft()
-            
-            # Check if user exceeds rate limit
-            if len(user_queue) >= self.max_requests:
-                oldest_request = user_queue[0]
-                reset_time = oldest_request + self.window_seconds
-                seconds_until_reset = max(0, int(reset_time - current_time))
-                return True, seconds_until_reset
-            
-            # Add current request
-            user_queue.append(current_time)
-            return False, 0
-    
+        now = time.monotonic()
+        full_at = max(self.user_full_at.get(user_id, now), now)
+
+        # Each spent token pushes full_at one interval further out
+        excess = full_at + self.interval - now - self.window_seconds
+        if excess > EPSILON:
+            return True, math.ceil(excess)
+
+        self.user_full_at[user_id] = full_at + self.interval
+        if len(self.user_full_at) > self._sweep_at:
+            self._sweep(now)
+        return False, 0
+
     async def get_user_stats(self, user_id: int) -> Dict[str, int]:
         """Get user's current rate limit stats"""
-        async with self._lock:
-            current_time = time.time()
-            user_queue = self.user_requests[user_id]
-            
-            # Clean old requests
-            while user_queue and user_queue[0] < current_time - self.window_seconds:
-                user_queue.popleft()
-            
-            remaining = max(0, self.max_requests - len(user_queue))
-            used = len(user_queue)
-            
-            # Calculate reset time
-            reset_in = 0
-            if user_queue:
-                oldest_request = user_queue[0]
-                reset_in = max(0, int(oldest_request + self.window_seconds - current_time))
-            
-            return {
-                'used': used,
-                'remaining': remaining,
-                'max_requests': self.max_requests,
-                'window_seconds': self.window_seconds,
-                'reset_in': reset_in
-            }
-    
+        now = time.monotonic()
+        backlog = max(0.0, self.user_full_at.get(user_id, now) - now)
+        used = math.ceil(backlog / self.interval - EPSILON)
+
+        return {
+            'used': used,
+            'remaining': self.max_requests - used,
+            'max_requests': self.max_requests,
+            'window_seconds': self.window_seconds,
+            'reset_in': math.ceil(backlog)
+        }
+
     async def reset_user(self, user_id: int):
         """Reset rate limit for a user (admin function)"""
-        async with self._lock:
-            if user_id in self.user_requests:
-                self.user_requests[user_id].clear()
-                logger.info(f"Rate limit reset for user {user_id}")
-    
+        if self.user_full_at.pop(user_id, None) is not None:
+            logger.info(f"Rate limit reset for user {user_id}")
+
+    def _sweep(self, now: float) -> int:
+        """Drop users whose bucket has refilled completely; they are equivalent to no entry"""
+        idle = [user_id for user_id, full_at in self.user_full_at.items() if full_at <= now]
+        for user_id in idle:
+            del self.user_full_at[user_id]
+
+        # Back off if most users are still active so sweeps stay amortized O(1)
+        self._sweep_at = max(MAX_TRACKED_USERS, 2 * len(self.user_full_at))
+        return len(idle)
+
     async def cleanup_old_entries(self):
-        """Cleanup old entries to prevent memory leaks"""
-        async with self._lock:
-            current_time = time.time()
-            users_to_remove = []
-            
-            for user_id, user_queue in self.user_requests.items():
-                # Remove old requests
-                while user_queue and user_queue[0] < current_time - self.window_seconds:
-                    user_queue.popleft()
-                
-                # Remove users with no recent requests
-                if not user_queue:
-                    users_to_remove.append(user_id)
-            
-            for user_id in users_to_remove:
-                del self.user_requests[user_id]
-            
-            if users_to_remove:
-                logger.debug(f"Cleaned up rate limiter entries for {len(users_to_remove)} users")
+        """Cleanup idle entries to prevent memory leaks"""
+        removed = self._sweep(time.monotonic())
+        if removed:
+            logger.debug(f"Cleaned up rate limiter entries for {removed} users")
 
 # Global rate limiter instance
 rate_limiter = RateLimiter()
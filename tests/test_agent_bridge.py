@@ -0,0 +1,78 @@
+"""Semantic response cache behaviour of ollama-agent-bridge.py"""
+
+import asyncio
+import hashlib
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+
+_spec = importlib.util.spec_from_file_location(
+    'ollama_agent_bridge', Path(__file__).resolve().parent.parent / 'ollama-agent-bridge.py'
+)
+bridge_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(bridge_module)
+
+class FakeOllama:
+    """Stands in for OllamaHTTPClient: bag-of-words embeddings and counted chats"""
+    
+    def __init__(self):
+        self.chats = []
+    
+    async def embeddings(self, prompt, model):
+        vector = np.zeros(256, dtype=np.float32)
+        for word in prompt.lower().split():
+            vector[hashlib.sha256(word.encode()).digest()[0]] += 1.0
+        return vector.tolist()
+    
+    async def chat(self, messages, model, stream=True, keep_alive=None, options=None):
+        self.chats.append(messages[-1]['content'])
+        yield f"answer {len(self.chats)}"
+
+def make_bridge(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    bridge = bridge_module.OllamaAgentBridge()
+    bridge.client = FakeOllama()
+    return bridge
+
+TEMPLATE = (
+    "Provide a comprehensive overview and analysis of the following topic, covering "
+    "background, current state, key players, open problems and likely future directions. "
+    "Structure the answer with short headings and keep each section brief. Topic: {}"
+)
+
+def test_unrelated_questions_sharing_a_template_miss_the_cache(tmp_path, monkeypatch):
+    bridge = make_bridge(tmp_path, monkeypatch)
+    
+    async def run():
+        first = await bridge.query_agent('general-assistant', 'rust borrow checker', template=TEMPLATE)
+        second = await bridge.query_agent('general-assistant', 'sourdough baking', template=TEMPLATE)
+        return first, second
+    
+    first, second = asyncio.run(run())
+    
+    assert len(bridge.client.chats) == 2
+    assert 'answer 1' in first and 'answer 2' in second
+
+def test_repeated_question_hits_the_cache(tmp_path, monkeypatch):
+    bridge = make_bridge(tmp_path, monkeypatch)
+    
+    async def run():
+        await bridge.query_agent('general-assistant', 'rust borrow checker', template=TEMPLATE)
+        return await bridge.query_agent('general-assistant', 'Rust  borrow checker', template=TEMPLATE)
+    
+    second = asyncio.run(run())
+    
+    assert len(bridge.client.chats) == 1
+    assert 'answer 1' in second
+
+def test_cache_is_scoped_to_the_agent(tmp_path, monkeypatch):
+    bridge = make_bridge(tmp_path, monkeypatch)
+    
+    async def run():
+        await bridge.query_agent('general-assistant', 'rust borrow checker')
+        await bridge.query_agent('tutor', 'rust borrow checker')
+    
+    asyncio.run(run())
+    
+    assert len(bridge.client.chats) == 2
@@ -0,0 +1,53 @@
+"""Batched indexing in advanced_rag_system.py"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+for _module in ('chromadb', 'sentence_transformers', 'PyPDF2', 'arxiv', 'scholarly'):
+    pytest.importorskip(_module)
+
+@pytest.fixture
+def rag_module(tmp_path, monkeypatch):
+    # Importing the module builds its global AdvancedRAGSystem under ./rag_data
+    monkeypatch.chdir(tmp_path)
+    import advanced_rag_system
+    return advanced_rag_system
+
+class FakeEncoder:
+    def encode(self, texts, batch_size=32, **kwargs):
+        return np.ones((len(texts), 8), dtype=np.float32)
+
+class FakeCollection:
+    """Mimics Chroma's refusal of batches that repeat an ID"""
+    
+    def __init__(self):
+        self.rows = {}
+    
+    def upsert(self, ids, documents, embeddings, metadatas):
+        if len(set(ids)) != len(ids):
+            raise ValueError("Expected IDs to be unique")
+        self.rows.update(zip(ids, documents))
+
+def make_document(rag_module, title: str):
+    return rag_module.ResearchDocument(
+        id="", title=title, authors=["A. Author"], abstract=f"About {title}.",
+        content=f"{title} is studied here. It has results.", source="arxiv"
+    )
+
+def test_repeated_document_is_indexed_once(rag_module, tmp_path):
+    rag = rag_module.AdvancedRAGSystem(data_dir=str(tmp_path / "rag"))
+    rag.encoder = FakeEncoder()
+    rag.collection = FakeCollection()
+    
+    first = make_document(rag_module, "Sparse attention")
+    other = make_document(rag_module, "Graph kernels")
+    asyncio.run(rag.add_documents([first, other, make_document(rag_module, "Sparse attention")]))
+    
+    assert set(rag.documents) == {first.id, other.id}
+    assert {row_id.split('_chunk_')[0] for row_id in rag.collection.rows} == {first.id, other.id}
+    
+    # Adding it again in a later batch replaces its chunks instead of failing
+    asyncio.run(rag.add_documents([make_document(rag_module, "Sparse attention")]))
+    assert len(rag.documents) == 2
@@ -7,17 +7,23 @@ Combines clean terminal security with advanced RAG and GitHub automation
 import discord
 from discord.ext import commands
 import asyncio
+import importlib.util
+import io
 import logging
-from datetime import datetime
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import timedelta
 import json
 import os
 import sys
-import subprocess
+import re
+import shlex
 import sqlite3
+import threading
 from typing import Optional, List, Dict, Any
+import numpy as np
 import psutil
-from rich.console import Console
-from rich.table import Table
 
 # Import our enhanced systems
 try:
@@ -46,6 +52,95 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Command log rows are buffered and written in one transaction per flush
+LOG_FLUSH_INTERVAL = 1.0  # seconds
+LOG_FLUSH_BATCH = 500  # max rows per transaction
+
+# Whitelist of safe commands for /term
+SAFE_COMMANDS = frozenset({
+    'ls', 'cat', 'head', 'tail', 'grep', 'find', 'pwd', 'whoami', 'date', 'echo', 'git', 'python3', 'node', 'npm', 'pip3'
+})
+_SAFE_CMDS_STR = ', '.join(sorted(SAFE_COMMANDS))
+# Shell metacharacters; commands run without a shell, so reject them outright
+_BAD_RE = re.compile(r'[;&|`$><]')
+# /term output longer than this is attached as a file instead of inlined
+INLINE_OUTPUT_LIMIT = 1800
+MAX_ATTACHMENT_BYTES = 8 * 1024 * 1024  # Discord's smallest upload limit
+
+def _trunc(s: str, n: int) -> str:
+    """Shorten s to at most n characters, marking the cut with an ellipsis"""
+    return s if len(s) <= n else s[:n-1] + '…'
+
+# psutil readings are reused for this many seconds
+SYSTEM_SNAPSHOT_TTL = 5.0
+# A rendered /status embed is reused for this many seconds
+STATUS_CACHE_TTL = 3.0
+# /rag_ask questions outside this length skip the RAG pipeline entirely
+MIN_QUESTION_CHARS = 3
+MAX_QUESTION_CHARS = 1000
+_system_snapshot = (0.0, None, 0.0)  # (taken_at, virtual_memory, cpu_percent)
+
+def system_snapshot():
+    """Return (virtual_memory, cpu_percent), sampling psutil at most once per SYSTEM_SNAPSHOT_TTL"""
+    global _system_snapshot
+    taken_at, memory, cpu_percent = _system_snapshot
+    now = time.monotonic()
+    if memory is None or now - taken_at >= SYSTEM_SNAPSHOT_TTL:
+        memory, cpu_percent = psutil.virtual_memory(), psutil.cpu_percent()
+        _system_snapshot = (now, memory, cpu_percent)
+    return memory, cpu_percent
+
+class RAGResponseCache:
+    """TTL'd LRU of RAG results: exact key match first, then query-embedding similarity"""
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 600, threshold: float = 0.95):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        # key -> (expires_at, value, normalized query embedding or None)
+        self.entries: OrderedDict = OrderedDict()
+    
+    def get(self, key) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+    
+    def get_similar(self, vector: np.ndarray) -> Optional[Any]:
+        now = time.monotonic()
+        candidates = [(k, e) for k, e in self.entries.items() if e[2] is not None and e[0] >= now]
+        if not candidates:
+            return None
+        scores = np.stack([e[2] for _, e in candidates]) @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        key, entry = candidates[best]
+        self.entries.move_to_end(key)
+        return entry[1]
+    
+    def put(self, key, value: Any, vector: Optional[np.ndarray] = None):
+        self.entries[key] = (time.monotonic() + self.ttl, value, vector)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+    
+    def clear(self):
+        self.entries.clear()
+
+@dataclass(slots=True)
+class BotStats:
+    """Running counters shown by /status"""
+    commands_executed: int = 0
+    research_sessions: int = 0
+    rag_queries: int = 0
+    github_commits: int = 0
+    uptime_start: float = field(default_factory=time.monotonic)
+
 class UltimateResearchBot(commands.Bot):
     """Ultimate Academic Research Bot with all features"""
     
@@ -64,24 +159,27 @@ class UltimateResearchBot(commands.Bot):
         self.github_automation = github_automation
         self.research_active = False
         self.current_topic = None
-        self.console = Console()
+        self.rag_cache = RAGResponseCache()
+        self.status_cache = (0.0, None)  # (rendered_at, embed dict)
         
         # Database setup
+        self._log_buffer = deque()
+        self._flush_task = None
+        self._db_lock = threading.Lock()  # a cancelled flush may still be writing on its thread
+        self.conn = None
         self.setup_database()
         
         # Bot statistics
-        self.stats = {
-            'commands_executed': 0,
-            'research_sessions': 0,
-            'rag_queries': 0,
-            'github_commits': 0,
-            'uptime_start': datetime.now()
-        }
+        self.stats = BotStats()
     
     def setup_database(self):
         """Initialize SQLite database for logging and analytics"""
         try:
-            self.conn = sqlite3.connect('ultimate_research_bot.db')
+            # Writes happen on a worker thread (see flush_command_log)
+            self.conn = sqlite3.connect('ultimate_research_bot.db', check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("PRAGMA temp_store=MEMORY")
             self.conn.execute('''
                 CREATE TABLE IF NOT EXISTS command_history (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -112,6 +210,44 @@ class UltimateResearchBot(commands.Bot):
         except Exception as e:
             logger.error(f"Database setup failed: {e}")
     
+    async def setup_hook(self):
+        """Start background tasks once the event loop is running"""
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        self.tree.on_error = self.on_app_command_error
+    
+    async def close(self):
+        """Flush pending command logs before shutting down"""
+        if self._flush_task:
+            self._flush_task.cancel()
+        while self._log_buffer:
+            await self.flush_command_log()
+        if self.conn is not None:
+            with self._db_lock:
+                self.conn.close()
+        await super().close()
+    
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(LOG_FLUSH_INTERVAL)
+            while self._log_buffer:
+                await self.flush_command_log()
+    
+    async def flush_command_log(self):
+        """Write up to LOG_FLUSH_BATCH buffered command rows without blocking the event loop"""
+        rows = [self._log_buffer.popleft() for _ in range(min(LOG_FLUSH_BATCH, len(self._log_buffer)))]
+        await asyncio.to_thread(self._write_command_log, rows)
+    
+    def _write_command_log(self, rows: List[tuple]):
+        """Insert command rows in a single transaction"""
+        try:
+            with self._db_lock, self.conn:
+                self.conn.executemany(
+                    "INSERT INTO command_history (user_id, command, arguments, timestamp, success, execution_time) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+        except Exception as e:
+            logger.error(f"Failed to log {len(rows)} commands: {e}")
+    
     async def on_ready(self):
         """Bot ready event"""
         logger.info(f'🤖 Ultimate Research Bot "{self.user}" is now online!')
@@ -122,6 +258,13 @@ class UltimateResearchBot(commands.Bot):
             try:
                 await self.rag_system.initialize()
                 logger.info("✅ RAG system initialized")
+                
+                # Run one embedding and one retrieval so the first real query doesn't pay cold-start costs
+                try:
+                    await self.rag_system.embed("warmup")
+                    await self.rag_system.get_enhanced_response("hello", context_chunks=1)
+                except Exception as e:
+                    logger.warning(f"RAG warmup failed: {e}")
             except Exception as e:
                 logger.error(f"❌ RAG system initialization failed: {e}")
         
@@ -139,22 +282,38 @@ class UltimateResearchBot(commands.Bot):
         except Exception as e:
             logger.error(f"Failed to sync commands: {e}")
     
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        """Log every slash command that ran to completion"""
+        self.log_command(str(interaction.user.id), command.name, self._command_args(interaction), True, self._elapsed(interaction))
+    
+    async def on_app_command_error(self, interaction: discord.Interaction, error):
+        """Log slash commands that raised, with the traceback the default handler would print"""
+        command = interaction.command
+        if command is not None:
+            self.log_command(str(interaction.user.id), command.name, self._command_args(interaction), False, self._elapsed(interaction))
+        logger.error("App command %s failed", command.name if command else "?", exc_info=error)
+    
+    @staticmethod
+    def _command_args(interaction: discord.Interaction) -> str:
+        return ' '.join(f"{name}={value}" for name, value in interaction.namespace)
+    
+    @staticmethod
+    def _elapsed(interaction: discord.Interaction) -> float:
+        return (discord.utils.utcnow() - interaction.created_at).total_seconds()
+    
     async def on_command_error(self, ctx, error):
         """Global error handler"""
         logger.error(f"Command error: {error}")
         await ctx.send(f"❌ An error occurred: {str(error)}")
     
     def log_command(self, user_id: str, command: str, args: str = None, success: bool = True, exec_time: float = 0.0):
-        """Log command execution to database"""
-        try:
-            self.conn.execute(
-                "INSERT INTO command_history (user_id, command, arguments, success, execution_time) VALUES (?, ?, ?, ?, ?)",
-                (user_id, command, args, success, exec_time)
-            )
-            self.conn.commit()
-            self.stats['commands_executed'] += 1
-        except Exception as e:
-            logger.error(f"Failed to log command: {e}")
+        """Queue command execution for the next database flush"""
+        self.stats.commands_executed += 1
+        if self.conn is None:
+            return
+        # Record the time now; CURRENT_TIMESTAMP would give the flush time (UTC, same format)
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+        self._log_buffer.append((user_id, command, args, timestamp, success, exec_time))
 
 # Slash Commands - Terminal Integration
 @discord.app_commands.command(name="terminal", description="Create a secure terminal session")
@@ -168,7 +327,7 @@ async def terminal_create(interaction: discord.Interaction):
             title="🖥️ Secure Terminal Session",
             description="Terminal session created with security restrictions",
             color=0x00ff00,
-            timestamp=datetime.now()
+            timestamp=discord.utils.utcnow()
         )
         
         embed.add_field(
@@ -199,49 +358,60 @@ async def terminal_execute(interaction: discord.Interaction, command: str):
     """Execute command in secure terminal session"""
     await interaction.response.defer()
     
-    # Whitelist of safe commands
-    safe_commands = ['ls', 'cat', 'head', 'tail', 'grep', 'find', 'pwd', 'whoami', 'date', 'echo', 'git', 'python3', 'node', 'npm', 'pip3']
-    
     try:
-        cmd_parts = command.split()
-        if not cmd_parts or cmd_parts[0] not in safe_commands:
-            await interaction.followup.send(f"❌ Command '{cmd_parts[0] if cmd_parts else 'empty'}' not allowed. Safe commands: {', '.join(safe_commands)}")
+        head = command.strip().split(' ', 1)[0]
+        if head not in SAFE_COMMANDS:
+            await interaction.followup.send(f"❌ Command '{head or 'empty'}' not allowed. Safe commands: {_SAFE_CMDS_STR}")
             return
+        if _BAD_RE.search(command):
+            await interaction.followup.send("❌ Shell syntax (pipes, redirects, substitutions, chaining) is not allowed")
+            return
+        
+        cmd_parts = shlex.split(command)
         
-        # Execute command in restricted environment
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=30,
+        # Execute command in restricted environment, without a shell
+        proc = await asyncio.create_subprocess_exec(
+            *cmd_parts,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
             cwd="/home/nike"
         )
-        
-        output = result.stdout if result.stdout else result.stderr
-        if not output:
-            output = "Command executed successfully (no output)"
-        
-        # Truncate long output
-        if len(output) > 1800:
-            output = output[:1800] + "\n... (output truncated)"
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=30)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
+        
+        raw_output = stdout or stderr
+        attachment = None
+        if len(raw_output) > INLINE_OUTPUT_LIMIT:
+            # Upload long output as-is rather than truncating it into the embed
+            attachment = discord.File(io.BytesIO(raw_output[:MAX_ATTACHMENT_BYTES]), filename=f"{head}.txt")
+            description = f"📎 Output attached ({len(raw_output):,} bytes)"
+        else:
+            output = raw_output.decode(errors='replace') or "Command executed successfully (no output)"
+            description = f"```\n{output}\n```"
         
         embed = discord.Embed(
             title=f"🖥️ Terminal: {command}",
-            description=f"```\n{output}\n```",
-            color=0x00ff00 if result.returncode == 0 else 0xff0000,
-            timestamp=datetime.now()
+            description=description,
+            color=0x00ff00 if proc.returncode == 0 else 0xff0000,
+            timestamp=discord.utils.utcnow()
         )
         
         embed.add_field(
             name="Exit Code",
-            value=result.returncode,
+            value=proc.returncode,
             inline=True
         )
         
-        await interaction.followup.send(embed=embed)
+        if attachment:
+            await interaction.followup.send(embed=embed, file=attachment)
+        else:
+            await interaction.followup.send(embed=embed)
         
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         await interaction.followup.send("❌ Command timed out after 30 seconds")
     except Exception as e:
         await interaction.followup.send(f"❌ Command execution failed: {str(e)}")
@@ -263,7 +433,12 @@ async def rag_search(interaction: discord.Interaction, query: str, sources: str
             source_filter = [s.strip() for s in sources.split(',')]
         
         # Search RAG system
-        results = await rag_system.search(query, n_results=10, include_sources=source_filter)
+        cache = interaction.client.rag_cache
+        cache_key = ('search', query, tuple(source_filter) if source_filter else None)
+        results = cache.get(cache_key)
+        if results is None:
+            results = await rag_system.search(query, n_results=10, include_sources=source_filter)
+            cache.put(cache_key, results)
         
         if not results:
             await interaction.followup.send("❌ No results found in knowledge base")
@@ -274,14 +449,14 @@ async def rag_search(interaction: discord.Interaction, query: str, sources: str
             title="📚 Knowledge Base Search Results",
             description=f"**Query:** {query}\n**Results:** {len(results)} documents found",
             color=0x9932cc,
-            timestamp=datetime.now()
+            timestamp=discord.utils.utcnow()
         )
         
         # Add top results
         for i, result in enumerate(results[:5]):
             embed.add_field(
-                name=f"📄 {result['title'][:50]}{'...' if len(result['title']) > 50 else ''}",
-                value=f"**Source:** {result['source']}\n**Authors:** {', '.join(result['authors'][:2])}\n**Relevance:** {(1-result['distance']):.2%}\n**Content:** {result['content'][:100]}...",
+                name=f"📄 {_trunc(result['title'], 50)}",
+                value=f"**Source:** {result['source']}\n**Authors:** {', '.join(result['authors'][:2])}\n**Relevance:** {(1-result['distance']):.2%}\n**Content:** {_trunc(result['content'], 100)}",
                 inline=False
             )
         
@@ -302,12 +477,15 @@ async def comprehensive_research(interaction: discord.Interaction, topic: str, o
     try:
         # Perform comprehensive research
         research_results = await rag_system.research_topic(topic, search_online=online)
+        if research_results['documents_found']:
+            # The knowledge base changed; cached answers may be stale
+            interaction.client.rag_cache.clear()
         
         embed = discord.Embed(
             title="🔍 Comprehensive Research Results",
             description=f"**Topic:** {topic}",
             color=0xff6600,
-            timestamp=datetime.now()
+            timestamp=discord.utils.utcnow()
         )
         
         embed.add_field(
@@ -323,8 +501,7 @@ async def comprehensive_research(interaction: discord.Interaction, topic: str, o
         )
         
         if research_results['documents_found']:
-            docs_text = "\n".join([f"• {doc[:60]}{'...' if len(doc) > 60 else ''}" 
-                                 for doc in research_results['documents_found'][:10]])
+            docs_text = "\n".join(f"• {_trunc(doc, 60)}" for doc in research_results['documents_found'][:10])
             embed.add_field(
                 name="New Documents Added",
                 value=docs_text or "None",
@@ -339,6 +516,16 @@ async def comprehensive_research(interaction: discord.Interaction, topic: str, o
 @discord.app_commands.command(name="rag_ask", description="Ask a question with RAG context")
 async def rag_ask(interaction: discord.Interaction, question: str):
     """Ask question with RAG-enhanced context"""
+    question = question.strip()
+    if not MIN_QUESTION_CHARS <= len(question) <= MAX_QUESTION_CHARS:
+        embed = discord.Embed(
+            title="❌ Question Rejected",
+            description=f"Questions must be {MIN_QUESTION_CHARS}-{MAX_QUESTION_CHARS} characters long.",
+            color=0xff0000
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+        return
+    
     await interaction.response.defer()
     
     if not rag_system:
@@ -346,19 +533,29 @@ async def rag_ask(interaction: discord.Interaction, question: str):
         return
     
     try:
-        # Get RAG context
-        rag_response = await rag_system.get_enhanced_response(question, context_chunks=5)
+        # Get RAG context, reusing answers to identical or near-identical questions
+        cache = interaction.client.rag_cache
+        cache_key = ('ask', question)
+        rag_response = cache.get(cache_key)
+        if rag_response is None:
+            question_embedding = await rag_system.embed(question)
+            rag_response = cache.get_similar(question_embedding)
+            if rag_response is None:
+                rag_response = await rag_system.get_enhanced_response(
+                    question, context_chunks=5, query_embedding=question_embedding
+                )
+            cache.put(cache_key, rag_response, question_embedding)
         
         # Create response embed
         embed = discord.Embed(
             title="🤖 RAG-Enhanced Response",
             description=f"**Question:** {question}",
             color=0x00ffff,
-            timestamp=datetime.now()
+            timestamp=discord.utils.utcnow()
         )
         
         # Add context summary
-        context_summary = rag_response['context'][:1500] + "..." if len(rag_response['context']) > 1500 else rag_response['context']
+        context_summary = _trunc(rag_response['context'], 1000)
         embed.add_field(
             name="Research Context",
             value=context_summary or "No relevant context found",
@@ -367,10 +564,10 @@ async def rag_ask(interaction: discord.Interaction, question: str):
         
         # Add sources
         if rag_response['sources']:
-            sources_text = "\n".join([
-                f"• {source['title'][:50]}{'...' if len(source['title']) > 50 else ''} ({source['source']})"
+            sources_text = "\n".join(
+                f"• {_trunc(source['title'], 50)} ({source['source']})"
                 for source in rag_response['sources'][:5]
-            ])
+            )
             embed.add_field(
                 name="Sources Referenced",
                 value=sources_text,
@@ -406,7 +603,7 @@ async def start_research_session(interaction: discord.Interaction, topic: str):
             title="🔬 Research Session Started",
             description=f"**Topic:** {topic}\n**Session ID:** {session_id}",
             color=0x00ff00,
-            timestamp=datetime.now()
+            timestamp=discord.utils.utcnow()
         )
         
         embed.add_field(
@@ -433,8 +630,8 @@ async def end_research_session(interaction: discord.Interaction, findings: str =
         # Parse findings
         key_findings = [f.strip() for f in findings.split('\n') if f.strip()] if findings else []
         
-        # End GitHub session
-        github_automation.end_research_session(key_findings)
+        # End GitHub session (commits with GitPython, so keep it off the event loop)
+        await asyncio.to_thread(github_automation.end_research_session, key_findings)
         
         # Generate documentation
         await github_automation.generate_research_documentation()
@@ -443,13 +640,13 @@ async def end_research_session(interaction: discord.Interaction, findings: str =
             title="📋 Research Session Completed",
             description=f"Session ended successfully",
             color=0x0099ff,
-            timestamp=datetime.now()
+            timestamp=discord.utils.utcnow()
         )
         
         if key_findings:
             embed.add_field(
                 name="Key Findings",
-                value="\n".join([f"• {finding}" for finding in key_findings[:5]]),
+                value="\n".join(f"• {finding}" for finding in key_findings[:5]),
                 inline=False
             )
         
@@ -471,21 +668,25 @@ async def show_status(interaction: discord.Interaction):
     await interaction.response.defer()
     
     try:
+        rendered_at, embed_dict = interaction.client.status_cache
+        if embed_dict is not None and time.monotonic() - rendered_at < STATUS_CACHE_TTL:
+            await interaction.followup.send(embed=discord.Embed.from_dict(embed_dict))
+            return
+        
         # System information
-        memory = psutil.virtual_memory()
-        cpu_percent = psutil.cpu_percent()
-        uptime = datetime.now() - interaction.client.stats['uptime_start']
+        memory, cpu_percent = system_snapshot()
+        uptime = timedelta(seconds=int(time.monotonic() - interaction.client.stats.uptime_start))
         
         embed = discord.Embed(
             title="🤖 Ultimate Research Bot Status",
             color=0x00ff00,
-            timestamp=datetime.now()
+            timestamp=discord.utils.utcnow()
         )
         
         # Bot statistics
         embed.add_field(
             name="📊 Bot Statistics",
-            value=f"**Uptime:** {uptime}\n**Commands Executed:** {interaction.client.stats['commands_executed']}\n**Research Sessions:** {interaction.client.stats['research_sessions']}\n**RAG Queries:** {interaction.client.stats['rag_queries']}",
+            value=f"**Uptime:** {uptime}\n**Commands Executed:** {interaction.client.stats.commands_executed}\n**Research Sessions:** {interaction.client.stats.research_sessions}\n**RAG Queries:** {interaction.client.stats.rag_queries}",
             inline=True
         )
         
@@ -516,6 +717,7 @@ async def show_status(interaction: discord.Interaction):
             inline=False
         )
         
+        interaction.client.status_cache = (time.monotonic(), embed.to_dict())
         await interaction.followup.send(embed=embed)
         
     except Exception as e:
@@ -532,6 +734,12 @@ async def main():
         logger.error("DISCORD_TOKEN not found in environment variables")
         return
     
+    # discord.py[speed] extras are picked up automatically when installed
+    if importlib.util.find_spec('orjson'):
+        logger.info("⚡ orjson available for gateway JSON")
+    else:
+        logger.info("orjson not installed; gateway JSON uses the stdlib parser")
+    
     # Initialize bot
     bot = UltimateResearchBot()
     
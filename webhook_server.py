@@ -5,13 +5,26 @@ Handles GitHub, monitoring, and CI/CD webhooks
 """
 
 import asyncio
-import json
 import hmac
-import hashlib
 import logging
-from datetime import datetime
-from typing import Dict, Any, Optional
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Dict, Any, List, Optional
 import aiohttp
+import json
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    # Stdlib fallback with the same bytes-in/bytes-out shape
+    _json_loads = json.loads
+    
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode()
 from aiohttp import web, ClientSession
 import discord
 import os
@@ -22,15 +35,95 @@ load_dotenv()
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+# Per-request INFO lines cost real time under webhook bursts; opt in with WEBHOOK_DEBUG=1
+logger.setLevel(logging.DEBUG if os.getenv('WEBHOOK_DEBUG') else logging.WARNING)
+
+# GitHub caps webhook payloads at 25 MB; aiohttp's default limit is 1 MB
+MAX_WEBHOOK_BODY = 25 * 1024 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+
+# Discord accepts up to 10 embeds and 6000 embed characters per webhook message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+EMBED_BATCH_WINDOW = 0.25  # seconds to wait for more embeds after the first
+EMBED_QUEUE_SIZE = 1000
+MAX_SEEN_DELIVERIES = 4096  # GitHub delivery IDs remembered for retry dedup
+
+# Embed colors by event action/conclusion; anything else gets the default blue
+DEFAULT_EMBED_COLOR = 0x17a2b8
+_PR_COLORS = {
+    'opened': 0x28a745,
+    'closed': 0xdc3545,
+    'merged': 0x6f42c1,
+    'reopened': 0xffc107
+}
+_ISSUE_COLORS = {
+    'opened': 0xdc3545,
+    'closed': 0x28a745,
+    'reopened': 0xffc107
+}
+_WORKFLOW_COLORS = {
+    'success': 0x28a745,
+    'failure': 0xdc3545,
+    'cancelled': 0x6c757d,
+    'skipped': 0xffc107
+}
+
+# Response body for monitoring and CI/CD hooks never changes
+_PROCESSED_BODY = _json_dumps({'status': 'processed'})
+_DUPLICATE_BODY = _json_dumps({'status': 'duplicate'})
+
+_iso_now = (0, '')  # (unix second, its ISO-8601 UTC string)
+
+def _cached_isoformat() -> str:
+    """Current UTC time as ISO-8601, formatted at most once per second"""
+    global _iso_now
+    second = int(time.time())
+    if second != _iso_now[0]:
+        _iso_now = (second, datetime.fromtimestamp(second, timezone.utc).isoformat())
+    return _iso_now[1]
+
+def _embed_size(embed: Dict[str, Any]) -> int:
+    """Characters Discord counts toward the per-message embed limit"""
+    # Payload values land in embeds as-is and may be null or numbers
+    def text_len(value) -> int:
+        return 0 if value is None else len(str(value))
+    
+    return (text_len(embed.get('title')) + text_len(embed.get('description'))
+            + sum(text_len(f.get('name')) + text_len(f.get('value')) for f in embed.get('fields') or ()))
+
+def _format_commit(commit: Dict[str, Any]) -> str:
+    """One 'Recent Commits' line for a push embed"""
+    commit_id = commit.get('id', '')
+    url = commit.get('url', '')
+    message = commit.get('message', '')
+    return f"• [`{commit_id[:7]}`]({url}) {message[:50]}..."
+
+def _json_response(data: Dict[str, Any], status: int = 200) -> web.Response:
+    """JSON response encoded with orjson (when installed) instead of aiohttp's stdlib encoder"""
+    return web.Response(body=_json_dumps(data), status=status, content_type='application/json')
 
 class WebhookServer:
     """Advanced webhook server with Discord integration"""
     
     def __init__(self, port: int = 8080):
         self.port = port
-        self.app = web.Application()
-        self.discord_webhook_url = None
+        self.app = web.Application(client_max_size=MAX_WEBHOOK_BODY)
+        self.discord_webhook_url = os.getenv('DISCORD_WEBHOOK_URL')
+        # Shared keep-alive session for Discord posts, created in start_server
+        self.session: Optional[ClientSession] = None
+        self.runner: Optional[web.AppRunner] = None
+        # Embeds waiting to be batched into one post, drained by _flush_embeds
+        self.embed_queue: Optional[asyncio.Queue] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        # X-GitHub-Delivery IDs already processed, oldest first
+        self.seen_deliveries: OrderedDict = OrderedDict()
         self.github_secret = os.getenv('GITHUB_WEBHOOK_SECRET', '')
+        # /webhook/health body is fixed except for the timestamp spliced between these
+        self._health_prefix = b'{"status":"healthy","server":"Discord Bot Webhook Server","timestamp":"'
+        self._health_suffix = b'"}'
+        # Keyed once; each request copies it instead of redoing the key schedule
+        self._hmac_template = hmac.new(self.github_secret.encode(), digestmod='sha256') if self.github_secret else None
         
         # Setup routes
         self._setup_routes()
@@ -49,82 +142,103 @@ class WebhookServer:
     
     async def health_check(self, request):
         """Health check endpoint"""
-        return web.json_response({
-            'status': 'healthy',
-            'timestamp': datetime.now().isoformat(),
-            'server': 'Discord Bot Webhook Server'
-        })
+        timestamp = _cached_isoformat().encode()
+        return web.Response(
+            body=self._health_prefix + timestamp + self._health_suffix,
+            content_type='application/json'
+        )
     
     def verify_github_signature(self, payload: bytes, signature: str) -> bool:
         """Verify GitHub webhook signature"""
-        if not self.github_secret:
+        if self._hmac_template is None:
             return True  # Skip verification if no secret
             
-        expected_signature = hmac.new(
-            self.github_secret.encode(),
-            payload,
-            hashlib.sha256
-        ).hexdigest()
+        h = self._hmac_template.copy()
+        h.update(payload)
+        return self._signature_matches(h, signature)
+    
+    @staticmethod
+    def _signature_matches(h, signature: str) -> bool:
+        """Compare an HMAC already fed the whole payload against the signature header"""
+        if not signature.startswith('sha256='):
+            return False
         
-        return hmac.compare_digest(f"sha256={expected_signature}", signature)
+        try:
+            received = bytes.fromhex(signature[7:])
+        except ValueError:
+            return False
+        
+        return hmac.compare_digest(h.digest(), received)
     
     async def handle_github_webhook(self, request):
         """Handle GitHub webhook events"""
+        delivery_id = None
         try:
             # Get headers
             event_type = request.headers.get('X-GitHub-Event', 'unknown')
             signature = request.headers.get('X-Hub-Signature-256', '')
             
-            # Get payload
-            payload_bytes = await request.read()
-            payload = json.loads(payload_bytes.decode('utf-8'))
+            # Stream the payload, hashing each chunk as it arrives instead of after a full read()
+            h = self._hmac_template.copy() if self._hmac_template is not None else None
+            payload_bytes = bytearray()
+            async for chunk in request.content.iter_chunked(READ_CHUNK_SIZE):
+                payload_bytes += chunk
+                if len(payload_bytes) > MAX_WEBHOOK_BODY:
+                    return web.Response(status=413, text="Payload too large")
+                if h is not None:
+                    h.update(chunk)
             
             # Verify signature
-            if not self.verify_github_signature(payload_bytes, signature):
+            if h is not None and not self._signature_matches(h, signature):
                 logger.warning("Invalid GitHub webhook signature")
                 return web.Response(status=401, text="Invalid signature")
             
-            logger.info(f"Received GitHub {event_type} event")
+            # GitHub retries reuse the delivery ID. Reserve it before processing (no await
+            # between check and insert) so concurrent retries are handled exactly once
+            delivery_id = request.headers.get('X-GitHub-Delivery')
+            if delivery_id:
+                if delivery_id in self.seen_deliveries:
+                    return web.Response(body=_DUPLICATE_BODY, content_type='application/json')
+                self.seen_deliveries[delivery_id] = None
+                if len(self.seen_deliveries) > MAX_SEEN_DELIVERIES:
+                    self.seen_deliveries.popitem(last=False)
+            
+            payload = _json_loads(payload_bytes)
+            
+            logger.info("Received GitHub %s event", event_type)
             
             # Process different event types
-            embed = await self.process_github_event(event_type, payload)
+            embed = self.process_github_event(event_type, payload)
             
             if embed:
                 await self.send_to_discord(embed)
             
-            return web.json_response({'status': 'processed', 'event': event_type})
+            return _json_response({'status': 'processed', 'event': event_type})
             
         except Exception as e:
+            # Let GitHub's retry of a failed delivery through
+            if delivery_id:
+                self.seen_deliveries.pop(delivery_id, None)
             logger.error(f"GitHub webhook processing failed: {e}")
             return web.Response(status=500, text=f"Processing failed: {str(e)}")
     
-    async def process_github_event(self, event_type: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def process_github_event(self, event_type: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Process GitHub webhook events and create Discord embeds"""
-        
-        if event_type == 'push':
-            return await self._create_push_embed(payload)
-        elif event_type == 'pull_request':
-            return await self._create_pr_embed(payload)
-        elif event_type == 'issues':
-            return await self._create_issue_embed(payload)
-        elif event_type == 'release':
-            return await self._create_release_embed(payload)
-        elif event_type == 'workflow_run':
-            return await self._create_workflow_embed(payload)
-        
-        return None
+        builder = self._EVENT_BUILDERS.get(event_type)
+        return builder(self, payload) if builder else None
     
-    async def _create_push_embed(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    def _create_push_embed(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Create embed for GitHub push events"""
         repo = payload.get('repository', {})
         pusher = payload.get('pusher', {})
         commits = payload.get('commits', [])
+        commit_count = len(commits)
         
         embed = {
             'title': '🔄 New Push to Repository',
-            'description': f"**{len(commits)}** commits pushed to **{repo.get('full_name', 'Unknown')}**",
+            'description': f"**{commit_count}** commits pushed to **{repo.get('full_name', 'Unknown')}**",
             'color': 0x28a745,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': _cached_isoformat(),
             'fields': [
                 {
                     'name': 'Pusher',
@@ -133,92 +247,81 @@ class WebhookServer:
                 },
                 {
                     'name': 'Branch',
-                    'value': payload.get('ref', 'unknown').replace('refs/heads/', ''),
+                    'value': payload.get('ref', 'unknown').removeprefix('refs/heads/'),
                     'inline': True
                 },
                 {
                     'name': 'Commits',
-                    'value': str(len(commits)),
+                    'value': str(commit_count),
                     'inline': True
                 }
             ]
         }
         
         if commits:
-            commit_list = []
-            for commit in commits[:5]:  # Show max 5 commits
-                commit_list.append(f"• [`{commit.get('id', '')[:7]}`]({commit.get('url', '')}) {commit.get('message', '')[:50]}...")
-            
             embed['fields'].append({
                 'name': 'Recent Commits',
-                'value': '\n'.join(commit_list),
+                'value': '\n'.join(_format_commit(commit) for commit in islice(commits, 5)),  # Show max 5 commits
                 'inline': False
             })
         
         return embed
     
-    async def _create_pr_embed(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    def _create_pr_embed(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Create embed for GitHub pull request events"""
         action = payload.get('action', 'unknown')
         pr = payload.get('pull_request', {})
-        
-        color_map = {
-            'opened': 0x28a745,
-            'closed': 0xdc3545,
-            'merged': 0x6f42c1,
-            'reopened': 0xffc107
-        }
+        user = pr.get('user') or {}
+        base = pr.get('base') or {}
+        head = pr.get('head') or {}
+        body = pr.get('body') or ''
         
         embed = {
             'title': f'📋 Pull Request {action.title()}',
             'description': pr.get('title', 'No title'),
             'url': pr.get('html_url', ''),
-            'color': color_map.get(action, 0x17a2b8),
-            'timestamp': datetime.now().isoformat(),
+            'color': _PR_COLORS.get(action, DEFAULT_EMBED_COLOR),
+            'timestamp': _cached_isoformat(),
             'fields': [
                 {
                     'name': 'Author',
-                    'value': pr.get('user', {}).get('login', 'Unknown'),
+                    'value': user.get('login', 'Unknown'),
                     'inline': True
                 },
                 {
                     'name': 'Base → Head',
-                    'value': f"{pr.get('base', {}).get('ref', 'unknown')} ← {pr.get('head', {}).get('ref', 'unknown')}",
+                    'value': f"{base.get('ref', 'unknown')} ← {head.get('ref', 'unknown')}",
                     'inline': True
                 }
             ]
         }
         
-        if pr.get('body'):
+        if body:
             embed['fields'].append({
                 'name': 'Description',
-                'value': pr.get('body', '')[:200] + ('...' if len(pr.get('body', '')) > 200 else ''),
+                'value': body[:200] + ('...' if len(body) > 200 else ''),
                 'inline': False
             })
         
         return embed
     
-    async def _create_issue_embed(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    def _create_issue_embed(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Create embed for GitHub issue events"""
         action = payload.get('action', 'unknown')
         issue = payload.get('issue', {})
-        
-        color_map = {
-            'opened': 0xdc3545,
-            'closed': 0x28a745,
-            'reopened': 0xffc107
-        }
+        user = issue.get('user') or {}
+        labels = issue.get('labels')
         
         embed = {
             'title': f'🐛 Issue {action.title()}',
             'description': issue.get('title', 'No title'),
             'url': issue.get('html_url', ''),
-            'color': color_map.get(action, 0x17a2b8),
-            'timestamp': datetime.now().isoformat(),
+            'color': _ISSUE_COLORS.get(action, DEFAULT_EMBED_COLOR),
+            'timestamp': _cached_isoformat(),
             'fields': [
                 {
                     'name': 'Author',
-                    'value': issue.get('user', {}).get('login', 'Unknown'),
+                    'value': user.get('login', 'Unknown'),
                     'inline': True
                 },
                 {
@@ -229,27 +332,28 @@ class WebhookServer:
             ]
         }
         
-        if issue.get('labels'):
-            labels = [label['name'] for label in issue['labels']]
+        if labels:
             embed['fields'].append({
                 'name': 'Labels',
-                'value': ', '.join(labels),
+                'value': ', '.join(label['name'] for label in labels),
                 'inline': True
             })
         
         return embed
     
-    async def _create_release_embed(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    def _create_release_embed(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Create embed for GitHub release events"""
         action = payload.get('action', 'unknown')
         release = payload.get('release', {})
+        author = release.get('author') or {}
+        body = release.get('body') or ''
         
         embed = {
             'title': f'🚀 Release {action.title()}',
             'description': release.get('name', 'No name'),
             'url': release.get('html_url', ''),
             'color': 0x6f42c1,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': _cached_isoformat(),
             'fields': [
                 {
                     'name': 'Tag',
@@ -258,39 +362,33 @@ class WebhookServer:
                 },
                 {
                     'name': 'Author',
-                    'value': release.get('author', {}).get('login', 'Unknown'),
+                    'value': author.get('login', 'Unknown'),
                     'inline': True
                 }
             ]
         }
         
-        if release.get('body'):
+        if body:
             embed['fields'].append({
                 'name': 'Release Notes',
-                'value': release.get('body', '')[:300] + ('...' if len(release.get('body', '')) > 300 else ''),
+                'value': body[:300] + ('...' if len(body) > 300 else ''),
                 'inline': False
             })
         
         return embed
     
-    async def _create_workflow_embed(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    def _create_workflow_embed(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Create embed for GitHub workflow events"""
         workflow = payload.get('workflow_run', {})
         conclusion = workflow.get('conclusion', 'unknown')
-        
-        color_map = {
-            'success': 0x28a745,
-            'failure': 0xdc3545,
-            'cancelled': 0x6c757d,
-            'skipped': 0xffc107
-        }
+        actor = workflow.get('actor') or {}
         
         embed = {
             'title': f'⚙️ Workflow {conclusion.title()}',
             'description': workflow.get('name', 'Unknown workflow'),
             'url': workflow.get('html_url', ''),
-            'color': color_map.get(conclusion, 0x17a2b8),
-            'timestamp': datetime.now().isoformat(),
+            'color': _WORKFLOW_COLORS.get(conclusion, DEFAULT_EMBED_COLOR),
+            'timestamp': _cached_isoformat(),
             'fields': [
                 {
                     'name': 'Branch',
@@ -304,7 +402,7 @@ class WebhookServer:
                 },
                 {
                     'name': 'Actor',
-                    'value': workflow.get('actor', {}).get('login', 'Unknown'),
+                    'value': actor.get('login', 'Unknown'),
                     'inline': True
                 }
             ]
@@ -312,10 +410,19 @@ class WebhookServer:
         
         return embed
     
+    # GitHub event type -> embed builder, looked up once per delivery
+    _EVENT_BUILDERS = {
+        'push': _create_push_embed,
+        'pull_request': _create_pr_embed,
+        'issues': _create_issue_embed,
+        'release': _create_release_embed,
+        'workflow_run': _create_workflow_embed
+    }
+    
     async def handle_monitoring_webhook(self, request):
         """Handle monitoring system webhooks (Grafana, Prometheus, etc.)"""
         try:
-            payload = await request.json()
+            payload = _json_loads(await request.read())
             logger.info("Received monitoring webhook")
             
             # Create monitoring alert embed
@@ -323,7 +430,7 @@ class WebhookServer:
                 'title': '⚠️ Monitoring Alert',
                 'description': payload.get('message', 'No message provided'),
                 'color': 0xffc107 if payload.get('status') == 'warning' else 0xdc3545,
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _cached_isoformat(),
                 'fields': [
                     {
                         'name': 'Status',
@@ -340,7 +447,7 @@ class WebhookServer:
             
             await self.send_to_discord(embed)
             
-            return web.json_response({'status': 'processed'})
+            return web.Response(body=_PROCESSED_BODY, content_type='application/json')
             
         except Exception as e:
             logger.error(f"Monitoring webhook processing failed: {e}")
@@ -349,7 +456,7 @@ class WebhookServer:
     async def handle_cicd_webhook(self, request):
         """Handle CI/CD pipeline webhooks"""
         try:
-            payload = await request.json()
+            payload = _json_loads(await request.read())
             logger.info("Received CI/CD webhook")
             
             # Create CI/CD embed
@@ -357,7 +464,7 @@ class WebhookServer:
                 'title': '🚀 CI/CD Pipeline Update',
                 'description': f"Pipeline **{payload.get('pipeline', 'unknown')}** {payload.get('status', 'unknown')}",
                 'color': 0x28a745 if payload.get('status') == 'success' else 0xdc3545,
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _cached_isoformat(),
                 'fields': [
                     {
                         'name': 'Status',
@@ -379,17 +486,77 @@ class WebhookServer:
             
             await self.send_to_discord(embed)
             
-            return web.json_response({'status': 'processed'})
+            return web.Response(body=_PROCESSED_BODY, content_type='application/json')
             
         except Exception as e:
             logger.error(f"CI/CD webhook processing failed: {e}")
             return web.Response(status=500, text=f"Processing failed: {str(e)}")
     
     async def send_to_discord(self, embed: Dict[str, Any]):
-        """Send embed to Discord via webhook or bot"""
-        # This would integrate with your Discord bot
-        # For now, just log the embed
-        logger.info(f"Discord embed: {json.dumps(embed, indent=2)}")
+        """Queue embed for the next batched Discord webhook post"""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Discord embed: %s", json.dumps(embed, indent=2, ensure_ascii=False))
+        
+        if not self.discord_webhook_url or self.embed_queue is None:
+            return
+        
+        try:
+            self.embed_queue.put_nowait(embed)
+        except asyncio.QueueFull:
+            logger.warning("Discord embed queue full, dropping embed")
+    
+    async def _flush_embeds(self):
+        """Coalesce queued embeds into as few webhook posts as Discord allows; None stops it"""
+        loop = asyncio.get_running_loop()
+        carry = None
+        while True:
+            first = carry if carry is not None else await self.embed_queue.get()
+            carry = None
+            if first is None:
+                return
+            
+            stop = False
+            # One bad embed or failed post must not kill the only flusher task
+            try:
+                batch = [first]
+                size = _embed_size(first)
+                deadline = loop.time() + EMBED_BATCH_WINDOW
+                while len(batch) < MAX_EMBEDS_PER_MESSAGE:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        embed = await asyncio.wait_for(self.embed_queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    if embed is None:
+                        stop = True
+                        break
+                    embed_size = _embed_size(embed)
+                    if size + embed_size > MAX_EMBED_CHARS_PER_MESSAGE:
+                        carry = embed
+                        break
+                    batch.append(embed)
+                    size += embed_size
+                
+                await self._post_embeds(batch)
+            except Exception as e:
+                logger.error(f"Discord embed batch failed: {e}")
+            if stop:
+                return
+    
+    async def _post_embeds(self, embeds: List[Dict[str, Any]]):
+        """Send up to MAX_EMBEDS_PER_MESSAGE embeds in one webhook message"""
+        try:
+            async with self.session.post(
+                self.discord_webhook_url,
+                data=_json_dumps({'embeds': embeds}),
+                headers={'Content-Type': 'application/json'}
+            ) as response:
+                if response.status >= 400:
+                    logger.warning(f"Discord webhook rejected {len(embeds)} embeds: HTTP {response.status}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Discord webhook post failed: {e!r}")
     
     def set_discord_webhook(self, webhook_url: str):
         """Set Discord webhook URL"""
@@ -398,16 +565,35 @@ class WebhookServer:
     
     async def start_server(self):
         """Start the webhook server"""
-        runner = web.AppRunner(self.app)
-        await runner.setup()
+        self.session = ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=75),
+            timeout=aiohttp.ClientTimeout(total=30)
+        )
+        self.embed_queue = asyncio.Queue(maxsize=EMBED_QUEUE_SIZE)
+        self._flush_task = asyncio.create_task(self._flush_embeds())
+        
+        self.runner = web.AppRunner(self.app, access_log=None)
+        await self.runner.setup()
         
-        site = web.TCPSite(runner, '0.0.0.0', self.port)
+        site = web.TCPSite(self.runner, '0.0.0.0', self.port)
         await site.start()
         
-        logger.info(f"🚀 Webhook server started on port {self.port}")
-        logger.info(f"📡 GitHub webhook: http://localhost:{self.port}/webhook/github")
-        logger.info(f"📊 Monitoring webhook: http://localhost:{self.port}/webhook/monitoring")
-        logger.info(f"🔧 CI/CD webhook: http://localhost:{self.port}/webhook/cicd")
+        # WARNING so the one startup line survives the module's quiet default level
+        logger.warning(
+            "Webhook server started on port %d (endpoints: /webhook/github, /webhook/monitoring, /webhook/cicd)",
+            self.port
+        )
+    
+    async def close(self):
+        """Stop serving, flush queued embeds and close the Discord session"""
+        if self.runner:
+            await self.runner.cleanup()
+        if self._flush_task:
+            # The sentinel goes behind any queued embeds, so they are posted first
+            await self.embed_queue.put(None)
+            await self._flush_task
+        if self.session and not self.session.closed:
+            await self.session.close()
 
 async def main():
     """Main server execution"""
@@ -419,9 +605,16 @@ async def main():
     
     # Keep running
     try:
-        await asyncio.Event().wait()
+        await asyncio.get_running_loop().create_future()
     except KeyboardInterrupt:
         logger.info("Shutting down webhook server...")
+    finally:
+        await server.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())